@@ -1,12 +1,15 @@
 import re
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from functools import cached_property
 from typing import (
     Any,
     Callable,
     Generic,
     Iterable,
     Mapping,
-    Optional,
-    Set,
+    Sequence,
     TypeVar,
     cast,
     overload,
@@ -34,73 +37,147 @@ T3 = TypeVar("T3")
 
 TableShape = dict[tuple[int, int], tuple[int, int]]
 
+_SHAPE_CACHES = (
+    "row_count",
+    "col_count",
+    "_row_extents",
+    "_col_extents",
+    "_row_starts",
+    "_col_cells",
+    "_grid",
+)
+
 
 class Table(Generic[T]):
+    # cells live in parallel row-major arrays: anchor, span and value of each
+    # cell share one index, and the shape metrics are cached per table
     def __init__(self, contents: dict[tuple[int, int], T], shape: TableShape) -> None:
         if shape.keys() != contents.keys():
             raise ValueError("shape and contents do not match")
 
-        self._contents = contents
-        self._spans = shape
-
-    @property
+        anchors = sorted(shape)
+        self._anchors = anchors
+        self._spans = [shape[k] for k in anchors]
+        self._values = [contents[k] for k in anchors]
+        self._index = {k: i for i, k in enumerate(anchors)}
+
+    def _with_values(self, values: list[T2]) -> "Table[T2]":
+        # same cells with new contents, so the cached shape metrics carry over
+        table = cast(Table[T2], object.__new__(Table))
+        table._anchors = self._anchors
+        table._spans = self._spans
+        table._values = values
+        table._index = self._index
+        for name in _SHAPE_CACHES:
+            if name in self.__dict__:
+                table.__dict__[name] = self.__dict__[name]
+        return table
+
+    @cached_property
     def row_count(self):
-        return max(r + rspan for (r, _c), (rspan, _cspan) in self._spans.items())
+        return max(r + rspan for (r, _c), (rspan, _cspan) in zip(*self._cells))
 
-    @property
+    @cached_property
     def col_count(self):
-        return max(c + cspan for (_r, c), (_rspan, cspan) in self._spans.items())
+        return max(c + cspan for (_r, c), (_rspan, cspan) in zip(*self._cells))
+
+    @property
+    def _cells(self):
+        return self._anchors, self._spans
+
+    @cached_property
+    def _row_extents(self):
+        return [(r, r + rspan) for (r, _c), (rspan, _cspan) in zip(*self._cells)]
+
+    @cached_property
+    def _col_extents(self):
+        return [(c, c + cspan) for (_r, c), (_rspan, cspan) in zip(*self._cells)]
+
+    @cached_property
+    def _row_starts(self):
+        anchors = self._anchors
+        return [bisect_left(anchors, (r,)) for r in range(self.row_count + 1)]
+
+    @cached_property
+    def _col_cells(self):
+        cols: list[list[int]] = [[] for _ in range(self.col_count)]
+        for i, (_r, c) in enumerate(self._anchors):
+            cols[c].append(i)
+        return cols
+
+    @cached_property
+    def _grid(self):
+        # index of the cell covering every position, -1 where none does
+        ncol = self.col_count
+        grid = array("i", [-1]) * (self.row_count * ncol)
+        for i, ((r, c), (rspan, cspan)) in enumerate(zip(*self._cells)):
+            for row in range(r * ncol, (r + rspan) * ncol, ncol):
+                grid[row + c : row + c + cspan] = array("i", [i]) * cspan
+        return grid
 
     def __getitem__(self, index: tuple[int, int]):
-        return self._contents.__getitem__(index)
+        return self._values[self._index[index]]
+
+    def anchor(self, index: tuple[int, int]) -> tuple[int, int] | None:
+        r, c = index
+        if 0 <= r < self.row_count and 0 <= c < self.col_count:
+            i = self._grid[r * self.col_count + c]
+            if i >= 0:
+                return self._anchors[i]
+        return None
+
+    def row(self, r: int) -> list[T]:
+        starts = self._row_starts
+        return self._values[starts[r] : starts[r + 1]]
+
+    def column(self, c: int) -> list[T]:
+        return [self._values[i] for i in self._col_cells[c]]
 
     @overload
     def get(self, index: tuple[int, int], default: T2) -> T | T2: ...
 
     @overload
-    def get(self, index: tuple[int, int]) -> Optional[T]: ...
+    def get(self, index: tuple[int, int]) -> T | None: ...
 
-    def get(
-        self, index: tuple[int, int], default: Optional[T2] = None
-    ) -> T | T2 | None:
-        return self._contents.get(index, default)
+    def get(self, index: tuple[int, int], default: T2 | None = None) -> T | T2 | None:
+        i = self._index.get(index)
+        return default if i is None else self._values[i]
 
     @property
-    def shape(self):
-        return self._spans
+    def shape(self) -> TableShape:
+        return dict(zip(*self._cells))
 
     @property
     def values(self):
-        return list(self._contents.values())
+        return list(self._values)
 
     @property
     def indexed_cells(self):
-        return dict(self._contents)
+        return dict(zip(self._anchors, self._values))
 
     def map_contents(self, f: Callable[[T], T2]) -> "Table[T2]":
-        return Table({k: f(v) for k, v in self._contents.items()}, dict(self._spans))
+        return self._with_values(list(map(f, self._values)))
 
-    def remove_cells(self, predicate: Optional[Callable[[T], bool]]):
+    def remove_cells(self, predicate: Callable[[T], bool] | None):
         if not callable(predicate):
             predicate = is_none
 
-        empties = set(k for k, v in self._contents.items() if predicate(v))
+        kept = [i for i, v in enumerate(self._values) if not predicate(v)]
         return Table(
-            {k: v for k, v in self._contents.items() if k not in empties},
-            {k: v for k, v in self._spans.items() if k not in empties},
+            {self._anchors[i]: self._values[i] for i in kept},
+            {self._anchors[i]: self._spans[i] for i in kept},
         )
 
     def reshape(
         self, src: "Table[T2]", dst: "Table[T2]", default: T3
     ) -> "Table[T | T3]":
         lbl_to_index = {v: k for k, v in src.indexed_cells.items()}
-
-        def new_values():
-            for k, v in dst.indexed_cells.items():
-                if v in lbl_to_index:
-                    yield k, self.get(lbl_to_index[v], default)
-
-        return Table.Shape(dst.shape, dict(new_values()), default)
+        return dst._with_values(
+            [
+                self.get(lbl_to_index[v], default) if v in lbl_to_index else default
+                for v in dst._values
+            ]
+        )
 
     @classmethod
     def Shape(
@@ -127,52 +204,54 @@ class Table(Generic[T]):
             lines = lines.splitlines()
         lines = list(filter(None, (line.rstrip("\n\r ") for line in lines)))
 
-        r_seps: Set[tuple[int, int]] = set()
-        c_seps: Set[tuple[int, int]] = set()
-
+        has_r_seps = False
+        seps_by_row: list[list[int]] = []
+        c_seps: list[tuple[int, int]] = []
         for y, line in enumerate(lines):
             if all(c in row_separators or c == " " for c in line):
-                r_seps |= set((y, x) for x, c in enumerate(line) if c in row_separators)
+                xs = [x for x, c in enumerate(line) if c in row_separators]
+                has_r_seps = has_r_seps or bool(xs)
             else:
-                c_seps |= set((y, x) for x, c in enumerate(line) if c in col_separators)
-        all_seps = r_seps | c_seps
+                xs = [x for x, c in enumerate(line) if c in col_separators]
+                c_seps += ((y, x) for x in xs)
+            seps_by_row.append(xs)
 
-        w = max(x for _, x in all_seps)
-        h = max(y for y, _ in all_seps)
-        y2r: dict[int, int] = {}
-        x2c = {x: c for c, x in enumerate(sorted(set(x for _, x in c_seps)))}
+        w = max(max(xs, default=-1) for xs in seps_by_row)
+        h = max(y for y, xs in enumerate(seps_by_row) if xs)
+        col_xs = sorted(set(x for _, x in c_seps))
+        row_ys: list[int] = []
 
+        # cells already covered by a rect, one bitmap per line
+        covered = [bytearray(w + 1) for _ in range(h + 1)]
         rects: dict[tuple[int, int, int, int], list[str]] = {}
 
-        q = sorted(c_seps)
-        while q:
-            y0, x0 = q.pop(0)
-            if x0 >= w or any(_rect_contains(r, (y0, x0)) for r in rects):
+        for y0, x0 in c_seps:
+            if x0 >= w or covered[y0][x0]:
                 continue
 
-            x1 = x0 + 1
-            while x1 <= w and (y0, x1) not in all_seps:
-                x1 += 1
-            if x1 > w:
+            row = seps_by_row[y0]
+            i = bisect_right(row, x0)
+            if i == len(row):
                 continue
+            x1 = row[i]
 
             y1 = y0 + 1
-            if r_seps:
-                while y1 <= h and not any(
-                    (y1, x) in all_seps for x in range(x0 + 1, x1)
-                ):
+            if has_r_seps:
+                while y1 <= h and not _has_between(seps_by_row[y1], x0, x1):
                     y1 += 1
 
             rects[y0, x0, y1, x1] = [line[x0 + 1 : x1] for line in lines[y0:y1]]
+            for y in range(y0, min(y1, h + 1)):
+                covered[y][x0:x1] = b"\x01" * (x1 - x0)
 
-            if y0 not in y2r:
-                y2r[y0] = len(y2r)
+            if not row_ys or row_ys[-1] != y0:
+                row_ys.append(y0)
 
         shape: TableShape = {}
         contents: dict[tuple[int, int], str] = {}
         for (y0, x0, y1, x1), lines in rects.items():
-            r0, c0 = _find_next(y2r, y0), _find_next(x2c, x0)
-            r1, c1 = _find_next(y2r, y1), _find_next(x2c, x1)
+            r0, c0 = bisect_left(row_ys, y0), bisect_left(col_xs, x0)
+            r1, c1 = bisect_left(row_ys, y1), bisect_left(col_xs, x1)
             if strip:
                 lines = filter(None, map(str.strip, lines))
             shape[r0, c0] = r1 - r0, c1 - c0
@@ -185,17 +264,9 @@ def is_none(x: Any):
     return x is None
 
 
-def _find_next(xxx: dict[int, int], i: int):
-    for k, v in sorted(xxx.items()):
-        if k >= i:
-            return v
-    return max(xxx.values()) + 1
-
-
-def _rect_contains(r: tuple[int, int, int, int], p: tuple[int, int]):
-    x0, y0, x1, y1 = r
-    x, y = p
-    return x0 <= x < x1 and y0 <= y < y1
+def _has_between(xs: list[int], x0: int, x1: int):
+    i = bisect_right(xs, x0)
+    return i < len(xs) and xs[i] < x1
 
 
 def cjust(s: str, w: int) -> str:
@@ -223,26 +294,104 @@ def format_table(
     return "\n".join(lines)
 
 
+@dataclass(frozen=True)
+class AlignmentPlan:
+    sep: str
+    # (value index, start, end) of every cell starting on each line, left to right
+    lines: tuple[tuple[tuple[int, int, int], ...], ...]
+
+    def format_lines(
+        self, values: Sequence[str], just: Callable[[str, int], str] = cjust
+    ) -> list[str]:
+        sep = self.sep
+        lines: list[str] = []
+        for cells in self.lines:
+            parts: list[str] = []
+            pos = 0
+            for i, c0, c1 in cells:
+                cell = sep + just(_cell_text(values[i]), c1 - c0 - 1) + sep
+                if c0 > pos:
+                    parts.append(" " * (c0 - pos))
+                parts.append(cell[pos - c0 :] if c0 < pos else cell)
+                pos = max(pos, c0 + len(cell))
+            lines.append("".join(parts))
+        return lines
+
+    def format(
+        self, values: Sequence[str], just: Callable[[str, int], str] = cjust
+    ) -> str:
+        return "\n".join(self.format_lines(values, just))
+
+    # column widths fit the widest value of every table sharing the shape
+    @classmethod
+    def Compile(
+        cls,
+        shape: TableShape,
+        tables: Iterable[Sequence[str]],
+        sep: str = "|",
+        pad: str = " ",
+    ):
+        total_pad = len(pad) * 2 + len(sep)
+        ncol = max(c + cspan for (_r, c), (_rspan, cspan) in shape.items())
+        nrow = max(r + rspan for (r, _c), (rspan, _cspan) in shape.items())
+        spans = [(c, c + cspan) for (_r, c), (_rspan, cspan) in shape.items()]
+
+        widths = {(i, i + 1): 1 + len(sep) for i in range(ncol)}
+        for span in spans:
+            widths[span] = max(total_pad, widths.get(span, 0))
+        for values in tables:
+            for span, value in zip(spans, values):
+                width = len(_cell_text(value)) + total_pad
+                widths[span] = max(widths[span], width)
+
+        limits = _limits_from_span_widths(widths)
+        lines: list[list[tuple[int, int, int]]] = [[] for _ in range(nrow)]
+        for i, ((r, _c), (c0, c1)) in enumerate(zip(shape, spans)):
+            lines[r].append((i, limits[c0], limits[c1]))
+
+        return cls(
+            sep, tuple(tuple(sorted(cells, key=lambda x: x[1])) for cells in lines)
+        )
+
+
+def _cell_text(value: str) -> str:
+    lines = value.splitlines()
+    if len(lines) > 1:
+        raise ValueError(f"cannot format table with multiline cells: {lines!r}")
+    return lines[0] if lines else ""
+
+
 def format_boxed_table(
     table: Table[Any], pad: str = " ", just: Callable[[str, int], str] = cjust
 ) -> str:
-    bars: dict[tuple[int, int], int] = {}
-    cells: dict[tuple[int, int], str] = {}
-
     h_pad_width = len(pad)
     sep_width = 1
     v_sep_width = 1
     total_sep_width = h_pad_width + sep_width
 
-    for (r0, c0, r1, c1), content, content_size in _render(
-        table, h_sep_width=sep_width, h_pad_width=h_pad_width, v_sep_width=v_sep_width
-    ):
+    rects = list(
+        _render(
+            table,
+            h_sep_width=sep_width,
+            h_pad_width=h_pad_width,
+            v_sep_width=v_sep_width,
+        )
+    )
+    final_w = max(c1 for (_, _, _, c1), _, _ in rects) + 1
+    final_h = max(r1 for (_, _, r1, _), _, _ in rects) + 1
+
+    # one flag per grid position, padded by one on each side so that every
+    # junction can look at its neighbours without bounds checks
+    stride = final_w + 2
+    bars = bytearray(stride * (final_h + 2))
+    cells: dict[tuple[int, int], str] = {}
+    for (r0, c0, r1, c1), content, content_size in rects:
+        top, bottom = (r0 + 1) * stride + 1, (r1 + 1) * stride + 1
+        bars[top + c0 : top + c1 + 1] = b"\x01" * (c1 - c0 + 1)
+        bars[bottom + c0 : bottom + c1 + 1] = b"\x01" * (c1 - c0 + 1)
         for r in range(r0, r1 + 1):
-            bars[r, c0] = 1
-            bars[r, c1] = 1
-        for c in range(c0, c1 + 1):
-            bars[r0, c] = 1
-            bars[r1, c] = 1
+            bars[(r + 1) * stride + 1 + c0] = 1
+            bars[(r + 1) * stride + 1 + c1] = 1
 
         h, _w = content_size
         for r, line in enumerate(content, (r1 - r0 - 1 - h) // 2):
@@ -250,22 +399,29 @@ def format_boxed_table(
                 line, c1 - c0 - sep_width - sep_width
             )
 
-    final_w = max(c for _, c in bars) + 1
-    final_h = max(r for r, _ in bars) + 1
-    final = [[" "] * final_w for _ in range(final_h)]
-
-    for r, c in bars:
-        final[r][c] = _find_border(
-            bars.get((r - 1, c), 0),
-            bars.get((r, c + 1), 0),
-            bars.get((r + 1, c), 0),
-            bars.get((r, c - 1), 0),
+    final: list[list[str]] = []
+    for r in range(final_h):
+        i = (r + 1) * stride + 1
+        final.append(
+            [
+                (
+                    JUNCTIONS[
+                        bars[j - stride] << 3
+                        | bars[j + 1] << 2
+                        | bars[j + stride] << 1
+                        | bars[j - 1]
+                    ]
+                    if bars[j]
+                    else " "
+                )
+                for j in range(i, i + final_w)
+            ]
         )
 
     for (r, c), txt in cells.items():
         final[r][c : c + len(txt)] = txt
 
-    return "\n".join("".join(line) for line in final)
+    return "\n".join(map("".join, final))
 
 
 def _render(
@@ -277,42 +433,30 @@ def _render(
 ):
     total_pad = h_pad_width * 2 + h_sep_width
 
-    ncol = table.col_count
-    nrow = table.row_count
-
-    content_lines: dict[tuple[int, int], list[str]] = {}
-    for ij, content in table.indexed_cells.items():
-        content_str = str_f(content)
-        lines = [line.rstrip("\n\r") for line in content_str.splitlines()]
-        content_lines[ij] = lines
-
-    content_sizes: dict[tuple[int, int], tuple[int, int]] = {}
-    for ij, lines in content_lines.items():
-        content_sizes[ij] = (
-            len(lines),
-            max(len(line.rstrip("\n\r")) for line in lines) if lines else 0,
-        )
-
-    widths = {(i, i + 1): 1 + h_sep_width for i in range(ncol)}
-    heights = {(i, i + 1): 1 + v_sep_width for i in range(nrow)}
-    for (row, col), (rspan, cspan) in table.shape.items():
-        next_col = col + cspan
-        next_row = row + rspan
-        h, w = content_sizes.get((row, col), (0, 0))
-        heights[row, next_row] = max(h + v_sep_width, heights.get((row, next_row), 0))
-        widths[col, next_col] = max(w + total_pad, widths.get((col, next_col), 0))
+    content_lines = [
+        [line.rstrip("\n\r") for line in str_f(content).splitlines()]
+        for content in table._values
+    ]
+    content_sizes = [
+        (len(lines), max(map(len, lines), default=0)) for lines in content_lines
+    ]
+
+    # span extents come from the table, only the content sizes are new here
+    row_extents, col_extents = table._row_extents, table._col_extents
+    widths = {(i, i + 1): 1 + h_sep_width for i in range(table.col_count)}
+    heights = {(i, i + 1): 1 + v_sep_width for i in range(table.row_count)}
+    for rows, cols, (h, w) in zip(row_extents, col_extents, content_sizes):
+        heights[rows] = max(h + v_sep_width, heights.get(rows, 0))
+        widths[cols] = max(w + total_pad, widths.get(cols, 0))
 
     # TODO relax/balance loose columns
     c_limits = _limits_from_span_widths(widths)
     r_limits = _limits_from_span_widths(heights)
 
-    for (row, col), (rspan, cspan) in table.shape.items():
-        r0 = r_limits[row]
-        c0 = c_limits[col]
-        r1 = r_limits[row + rspan]
-        c1 = c_limits[col + cspan]
-        if (row, col) in content_lines:
-            yield (r0, c0, r1, c1), content_lines[row, col], content_sizes[row, col]
+    for (r0, r1), (c0, c1), lines, size in zip(
+        row_extents, col_extents, content_lines, content_sizes
+    ):
+        yield (r_limits[r0], c_limits[c0], r_limits[r1], c_limits[c1]), lines, size
 
 
 def _limits_from_span_widths(colspan_widths: dict[tuple[int, int], int]) -> list[int]:
@@ -341,3 +485,7 @@ def _edit_str(s: str, i: int, v: str) -> str:
         return s + " " * (i - len(s)) + v
     else:
         return s[:i] + v + s[i + len(v) :]
+
+
+# box-drawing character for every north/east/south/west combination of bars
+JUNCTIONS = [_find_border(i >> 3, i >> 2 & 1, i >> 1 & 1, i & 1) for i in range(16)]
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from collections.abc import Iterable, Iterator, Mapping
+from contextlib import contextmanager
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, TextIO
+
+GENERATOR_SOURCES = (
+    *sorted(Path(__file__).parent.glob("*.py")),
+    Path(__file__).parent / "qmk.template.h",
+    Path(__file__).parent / "qmk-keycodes.txt",
+)
+
+
+def default_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "ichnite-layout"
+
+
+def generator_version(extra_sources: Iterable[str | Path] = ()):
+    h = sha256()
+    for path in (*GENERATOR_SOURCES, *map(Path, extra_sources)):
+        h.update(path.name.encode())
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def bytes_digest(data: bytes):
+    return sha256(data).hexdigest()
+
+
+def file_digest(path: str | Path) -> str | None:
+    try:
+        with open(path, "rb") as f:
+            h = sha256()
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                h.update(chunk)
+            return h.hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def write_if_changed(path: str | Path, data: bytes) -> bool:
+    path = Path(path)
+    if file_digest(path) == bytes_digest(data):
+        return False
+
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+@contextmanager
+def replace_if_changed(path: str | Path) -> Iterator[TextIO]:
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    try:
+        with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+            yield f
+        if file_digest(tmp_path) == file_digest(path):
+            tmp_path.unlink()
+        else:
+            os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+class ArtifactCache:
+    def __init__(
+        self, directory: str | Path, version: str, max_entries: int = 256
+    ) -> None:
+        self.directory = Path(directory)
+        self.version = version
+        self.max_entries = max_entries
+
+    def key(self, source_digest: str, options: Mapping[str, Any]) -> str:
+        return bytes_digest(
+            json.dumps(
+                [self.version, source_digest, options], sort_keys=True, default=str
+            ).encode()
+        )
+
+    def get(self, key: str) -> bytes | None:
+        target = self.directory / "targets" / key
+        try:
+            digest = target.read_text().strip()
+            data = (self.directory / "objects" / digest).read_bytes()
+        except FileNotFoundError:
+            return None
+        if bytes_digest(data) != digest:
+            return None
+        # keep recently used targets around when pruning
+        target.touch()
+        return data
+
+    def put(self, key: str, data: bytes):
+        digest = bytes_digest(data)
+        write_if_changed(self._object_path(digest), data)
+        self._add_target(key, digest)
+
+    def put_file(self, key: str, path: str | Path):
+        digest = file_digest(path)
+        assert digest is not None
+        obj = self._object_path(digest)
+        if file_digest(obj) != digest:
+            tmp_path = obj.with_name(f".{digest}.tmp")
+            shutil.copyfile(path, tmp_path)
+            os.replace(tmp_path, obj)
+        self._add_target(key, digest)
+
+    def _object_path(self, digest: str):
+        (self.directory / "objects").mkdir(parents=True, exist_ok=True)
+        return self.directory / "objects" / digest
+
+    def _add_target(self, key: str, digest: str):
+        (self.directory / "targets").mkdir(parents=True, exist_ok=True)
+        write_if_changed(self.directory / "targets" / key, digest.encode())
+        self.prune()
+
+    def prune(self):
+        targets = list((self.directory / "targets").iterdir())
+        if len(targets) <= self.max_entries:
+            return
+
+        targets.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+        for target in targets[self.max_entries :]:
+            target.unlink(missing_ok=True)
+        live = {t.read_text().strip() for t in targets[: self.max_entries]}
+        for obj in (self.directory / "objects").iterdir():
+            if obj.name not in live:
+                obj.unlink(missing_ok=True)
+
+    def clear(self):
+        shutil.rmtree(self.directory / "targets", ignore_errors=True)
+        shutil.rmtree(self.directory / "objects", ignore_errors=True)
+
+
+class NoCache(ArtifactCache):
+    def __init__(self) -> None:
+        super().__init__("", "")
+
+    def get(self, key: str) -> bytes | None:
+        return None
+
+    def put(self, key: str, data: bytes):
+        pass
+
+    def put_file(self, key: str, path: str | Path):
+        pass
+
+    def clear(self):
+        pass
@@ -1,23 +1,38 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any, Iterable, Optional, Sequence, cast
+from types import MappingProxyType
+from typing import (
+    Any,
+    Hashable,
+    Iterable,
+    Iterator,
+    Mapping,
+    Sequence,
+    TextIO,
+    cast,
+)
+from weakref import WeakKeyDictionary
+
+from .flyweight import Interned
 
 
 @dataclass
 class Node:
     name: str
-    children: list[Node | Comment | Raw] = field(default_factory=list)
+    children: list[AnyNode | Comment | Raw] = field(default_factory=list)
     properties: dict[str, Any] = field(default_factory=dict)
-    label: Optional[str] = None
-    address: Optional[int] = None
-    comment: Optional[str] = None
+    label: str | None = None
+    address: int | None = None
+    comment: str | None = None
 
     def format_dt(self, indent: str = "\t"):
         return "\n".join(format_dtnode(self, indentation=indent))
 
-    def __iadd__(self, node: Node | Comment | Raw | Iterable[Node | Comment | Raw]):
-        if isinstance(node, (Node, Comment, Raw)):
+    def __iadd__(
+        self, node: AnyNode | Comment | Raw | Iterable[AnyNode | Comment | Raw]
+    ):
+        if isinstance(node, (Node, FrozenNode, Comment, Raw)):
             self.children.append(node)
         else:
             try:
@@ -30,6 +45,44 @@ class Node:
         self.properties[k] = v
 
 
+@dataclass(frozen=True, slots=True, eq=False)
+class FrozenNode(Interned):
+    name: str
+    children: tuple[FrozenNode | Comment | Raw, ...] = ()
+    properties: Mapping[str, Any] = field(default_factory=dict)
+    label: str | None = None
+    address: int | None = None
+    comment: str | None = None
+
+    def __post_init__(self):
+        object.__setattr__(self, "children", tuple(self.children))
+        object.__setattr__(self, "properties", MappingProxyType(dict(self.properties)))
+
+    def format_dt(self, indent: str = "\t"):
+        return "\n".join(self.formatted_lines(indent))
+
+    def formatted_lines(self, indentation: str = "\t") -> tuple[str, ...]:
+        formatted = _FORMATTED.setdefault(self, {})
+        try:
+            return formatted[indentation]
+        except KeyError:
+            lines = formatted[indentation] = tuple(_node_lines(self, "", indentation))
+            return lines
+
+
+# formatted lines per live node and indentation
+_FORMATTED: WeakKeyDictionary[FrozenNode, dict[str, tuple[str, ...]]] = (
+    WeakKeyDictionary()
+)
+
+
+AnyNode = Node | FrozenNode
+
+
+def node_key(node: AnyNode | Comment | Raw) -> Hashable:
+    return repr(node) if isinstance(node, Node) else node
+
+
 class PHandle(str):
     pass
 
@@ -85,12 +138,28 @@ def format_dtproperty(k: str, v: Any):
     return f"{k} = {format_value(v)};"
 
 
-def format_dtnode(node: Node, depth: int = 0, indentation: str = "\t") -> Iterable[str]:
-    def indent(line: str):
-        return indentation * depth + line
+def format_dtnode(
+    node: AnyNode, depth: int = 0, indentation: str = "\t"
+) -> Iterator[str]:
+    return _dtnode_lines(node, indentation * depth, indentation)
+
+
+def write_dtnode(node: AnyNode, sink: TextIO, depth: int = 0, indentation: str = "\t"):
+    for line in format_dtnode(node, depth, indentation):
+        sink.write(line)
+        sink.write("\n")
+
+
+def _dtnode_lines(node: AnyNode, prefix: str, indentation: str) -> Iterator[str]:
+    if isinstance(node, FrozenNode):
+        for line in node.formatted_lines(indentation):
+            yield prefix + line
+    else:
+        yield from _node_lines(node, prefix, indentation)
+
 
-    def indent_more(line: str):
-        return indentation * (depth + 1) + line
+def _node_lines(node: AnyNode, prefix: str, indentation: str) -> Iterator[str]:
+    inner = prefix + indentation
 
     name = node.name
     if node.label:
@@ -99,24 +168,24 @@ def format_dtnode(node: Node, depth: int = 0, indentation: str = "\t") -> Iterab
         name += f"@{node.address:x}"
 
     if node.comment:
-        comment_lines = f"/* {node.comment} */".splitlines()
-        yield indent(name + " { " + comment_lines[0])
-        yield from map(indent_more, comment_lines[1:])
+        first, *rest = f"/* {node.comment} */".splitlines()
+        yield f"{prefix}{name} {{ {first}"
+        for line in rest:
+            yield inner + line
     else:
-        yield indent(name + " {")
+        yield f"{prefix}{name} {{"
 
     for name, value in node.properties.items():
         if value is not None:
-            yield from map(indent_more, format_dtproperty(name, value).splitlines())
+            for line in format_dtproperty(name, value).splitlines():
+                yield inner + line
 
     for child in node.children:
-        if isinstance(child, Node):
-            yield from format_dtnode(child, depth + 1, indentation=indentation)
-        elif isinstance(child, Raw):
-            comment_lines = str(child).splitlines()
-            yield from map(indent_more, comment_lines)
+        if isinstance(child, (Node, FrozenNode)):
+            yield from _dtnode_lines(child, inner, indentation)
         else:
-            comment_lines = f"/* {child} */".splitlines()
-            yield from map(indent_more, comment_lines)
+            text = str(child) if isinstance(child, Raw) else f"/* {child} */"
+            for line in text.splitlines():
+                yield inner + line
 
-    yield indent("};")
+    yield prefix + "};"
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from collections.abc import Hashable
+from dataclasses import MISSING, Field, fields
+from types import MappingProxyType
+from typing import Any
+from weakref import WeakValueDictionary
+
+_INSTANCES: WeakValueDictionary[Hashable, Any] = WeakValueDictionary()
+_FIELDS: dict[type, tuple[Field[Any], ...]] = {}
+_NAMES: dict[type, frozenset[str]] = {}
+
+
+def _fields(cls: type) -> tuple[Field[Any], ...]:
+    try:
+        return _FIELDS[cls]
+    except KeyError:
+        spec = _FIELDS[cls] = fields(cls)
+        _NAMES[cls] = frozenset(f.name for f in spec)
+        return spec
+
+
+def _freeze(value: Any) -> Hashable:
+    if type(value) in (list, tuple):
+        return tuple, tuple(map(_freeze, value))
+    if type(value) in (dict, MappingProxyType):
+        return dict, tuple((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return type(value), tuple(map(_freeze, value))
+    try:
+        hash(value)
+    except TypeError:
+        return type(value), repr(value)
+    return type(value), value
+
+
+class Flyweight(type):
+    def __call__(cls, *args: Any, **kwargs: Any):
+        spec = _fields(cls)
+        if len(args) > len(spec) or not kwargs.keys() <= _NAMES[cls]:
+            return super().__call__(*args, **kwargs)
+
+        values = list(args)
+        for f in spec[len(args) :]:
+            if f.name in kwargs:
+                values.append(kwargs[f.name])
+            elif f.default is not MISSING:
+                values.append(f.default)
+            elif f.default_factory is not MISSING:
+                values.append(f.default_factory())
+            else:
+                return super().__call__(*args, **kwargs)
+
+        key = cls, *map(_freeze, values)
+        try:
+            return _INSTANCES[key]
+        except KeyError:
+            return _INSTANCES.setdefault(key, super().__call__(*args, **kwargs))
+
+
+class Interned(metaclass=Flyweight):
+    # weakly referenced so unused instances drop out of the intern table
+    __slots__ = ("__weakref__",)
+
+    def _values(self):
+        return tuple(getattr(self, f.name) for f in _fields(type(self)))
+
+    def __lt__(self, other: Any):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._values() < other._values()
+
+    def __le__(self, other: Any):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._values() <= other._values()
+
+    def __gt__(self, other: Any):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._values() > other._values()
+
+    def __ge__(self, other: Any):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._values() >= other._values()
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Hashable, Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import TypeVar
+
+from .asciitables import Table, format_boxed_table
+from .dt import FrozenNode, Node, format_value
+from .qmk import (
+    CustomLT,
+    CustomShift,
+    QmkBinding,
+    QmkLayoutModel,
+    QmkLT,
+    QmkMO,
+    QmkModtap,
+    QmkTO,
+)
+from .zmk import Binding, LayerBase, ZmkKeymapModel
+
+B = TypeVar("B", bound=Hashable)
+
+ENTRY_KINDS = ("macro", "tap-dance", "key-override", "hold-tap")
+
+# rough sizes in bytes, ZMK for 32-bit Zephyr builds and QMK for AVR where the
+# small MCUs are
+ZMK_BINDING_SIZE = 12  # struct zmk_behavior_binding: device name, param1, param2
+ZMK_DEVICE_SIZE = 40  # struct device, config header and init entry
+ZMK_DEVICE_STATE_SIZE = 4
+ZMK_MACRO_STATE_SIZE = 16
+ZMK_COMPATIBLE_KINDS = {
+    "zmk,behavior-macro": "macro",
+    "zmk,behavior-macro-one-param": "macro",
+    "zmk,behavior-macro-two-param": "macro",
+    "zmk,behavior-tap-dance": "tap-dance",
+    "zmk,behavior-mod-morph": "key-override",
+    "zmk,behavior-hold-tap": "hold-tap",
+}
+
+QMK_KEYCODE_SIZE = 2  # uint16_t in keymaps[][MATRIX_ROWS][MATRIX_COLS]
+QMK_POINTER_SIZE = 2
+QMK_KEY_OVERRIDE_SIZE = 18  # const key_override_t
+QMK_TAP_DANCE_SIZE = 14  # tap_dance_action_t, the actions table lives in RAM
+QMK_TDLT_DATA_SIZE = 4
+QMK_UNASSIGNED = ("KC_NO", "KC_TRNS", "XXXXXXX", "_______")
+
+
+@dataclass(frozen=True)
+class Entry:
+    kind: str
+    name: str
+    flash: int = 0
+    ram: int = 0
+
+
+@dataclass(frozen=True)
+class BindingCost:
+    behavior: str
+    assigned: bool
+    entries: tuple[Entry, ...] = ()
+
+
+@dataclass
+class Footprint:
+    layers: int = 0
+    bindings: int = 0
+    assigned: int = 0
+    keymap_size: int = 0
+    behaviors: set[str] = field(default_factory=set)
+    entries: dict[str, Entry] = field(default_factory=dict)
+
+    @property
+    def flash(self):
+        return self.keymap_size + sum(e.flash for e in self.entries.values())
+
+    @property
+    def ram(self):
+        return sum(e.ram for e in self.entries.values())
+
+    def count(self, kind: str):
+        return sum(e.kind == kind for e in self.entries.values())
+
+    def add_layer(self, costs: Sequence[BindingCost], binding_size: int):
+        self.layers += 1
+        self.bindings += len(costs)
+        self.keymap_size += len(costs) * binding_size
+        for cost in costs:
+            self.assigned += cost.assigned
+            self.behaviors.add(cost.behavior)
+            for entry in cost.entries:
+                self.entries[entry.name] = entry
+
+
+@dataclass
+class Analysis:
+    firmware: str
+    layout: str
+    total: Footprint
+    by_os: dict[str, Footprint]
+    by_layer: dict[str, Footprint]
+
+    @classmethod
+    def From_layers(
+        cls,
+        firmware: str,
+        layout: str,
+        layers: Sequence[LayerBase[B]],
+        layer_oses: Mapping[str, list[str]],
+        binding_cost: Callable[[B], BindingCost],
+        binding_size: int,
+    ):
+        costs: dict[B, BindingCost] = {}
+
+        def cost(binding: B):
+            try:
+                return costs[binding]
+            except KeyError:
+                c = costs[binding] = binding_cost(binding)
+                return c
+
+        total = Footprint()
+        by_os: dict[str, Footprint] = {}
+        by_layer: dict[str, Footprint] = {}
+        for layer in layers:
+            layer_costs = list(map(cost, layer.bindings))
+            scopes = [
+                total,
+                by_layer.setdefault(layer.name, Footprint()),
+                *(by_os.setdefault(os, Footprint()) for os in layer_oses[layer.name]),
+            ]
+            for footprint in scopes:
+                footprint.add_layer(layer_costs, binding_size)
+
+        return cls(firmware, layout, total, by_os, by_layer)
+
+
+def analyze_zmk(model: ZmkKeymapModel, layout: str):
+    return Analysis.From_layers(
+        "ZMK",
+        layout,
+        model.layers,
+        model.layer_oses,
+        zmk_binding_cost,
+        ZMK_BINDING_SIZE,
+    )
+
+
+def zmk_binding_cost(binding: Binding):
+    entries: list[Entry] = []
+    for node in binding.behavior_nodes:
+        if not isinstance(node, (Node, FrozenNode)):
+            continue
+        compatible = str(node.properties.get("compatible", ""))
+        kind = ZMK_COMPATIBLE_KINDS.get(
+            compatible, compatible.removeprefix("zmk,behavior-")
+        )
+        bindings = node.properties.get("bindings")
+        cells = format_value(bindings).count("&") if bindings else 0
+        entries.append(
+            Entry(
+                kind,
+                node.label or node.name,
+                flash=ZMK_DEVICE_SIZE + cells * ZMK_BINDING_SIZE,
+                ram=ZMK_DEVICE_STATE_SIZE
+                + (ZMK_MACRO_STATE_SIZE if kind == "macro" else 0),
+            )
+        )
+
+    return BindingCost(
+        binding.behavior,
+        binding.behavior not in ("none", "trans"),
+        tuple(entries),
+    )
+
+
+def analyze_qmk(model: QmkLayoutModel, layout: str):
+    return Analysis.From_layers(
+        "QMK",
+        layout,
+        model.layers,
+        model.layer_oses,
+        qmk_binding_cost,
+        QMK_KEYCODE_SIZE,
+    )
+
+
+def qmk_binding_cost(binding: QmkBinding):
+    assigned = str(binding) not in QMK_UNASSIGNED
+    if isinstance(binding, CustomShift):
+        entry = Entry(
+            "key-override",
+            f"{binding.normal}_{binding.shifted}",
+            flash=QMK_KEY_OVERRIDE_SIZE,
+            ram=QMK_POINTER_SIZE,
+        )
+        return BindingCost("KO", assigned, (entry,))
+    if isinstance(binding, CustomLT):
+        entry = Entry(
+            "tap-dance",
+            binding.identifier,
+            ram=QMK_TAP_DANCE_SIZE + QMK_TDLT_DATA_SIZE,
+        )
+        return BindingCost("TD", assigned, (entry,))
+    if isinstance(binding, QmkLT):
+        return BindingCost("LT", assigned)
+    if isinstance(binding, QmkMO):
+        return BindingCost("MO", assigned)
+    if isinstance(binding, QmkTO):
+        return BindingCost("TO", assigned)
+    if isinstance(binding, QmkModtap):
+        return BindingCost("MT", assigned)
+    return BindingCost(binding.value if binding.param else "KC", assigned)
+
+
+REPORT_COLUMNS = (
+    "",
+    "layers",
+    "bindings",
+    "assigned",
+    "behaviors",
+    "macros",
+    "tap-dances",
+    "key-overrides",
+    "hold-taps",
+    "flash ~B",
+    "RAM ~B",
+)
+
+
+def report_row(name: str, footprint: Footprint):
+    return [
+        name,
+        footprint.layers,
+        footprint.bindings,
+        footprint.assigned,
+        len(footprint.behaviors),
+        *(footprint.count(kind) for kind in ENTRY_KINDS),
+        footprint.flash,
+        footprint.ram,
+    ]
+
+
+def format_analysis(analysis: Analysis) -> str:
+    rows = [
+        list(REPORT_COLUMNS),
+        report_row("total", analysis.total),
+        *(report_row(f"os {os}", f) for os, f in analysis.by_os.items()),
+        *(report_row(name, f) for name, f in analysis.by_layer.items()),
+    ]
+    table = Table.Shape(
+        {(r, c): (1, 1) for r in range(len(rows)) for c in range(len(rows[0]))},
+        [str(v) for row in rows for v in row],
+        "",
+    )
+    return f"{analysis.firmware} {analysis.layout}\n{format_boxed_table(table)}"
+
+
+def format_analyses(analyses: Iterable[Analysis]) -> str:
+    return "\n\n".join(map(format_analysis, analyses))
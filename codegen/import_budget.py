@@ -0,0 +1,81 @@
+import re
+import subprocess
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+ENTRY_POINTS = ("generate", "render_svg")
+
+# only some subcommands need these, importing an entry point must not load them
+DEFERRED_MODULES = (
+    "jinja2",
+    "cairocffi",
+    "pangocffi",
+    "pangocairocffi",
+    "networkx",
+    "svgelements",
+    "codegen.qmk",
+    "codegen.footprint",
+    "codegen.service",
+    "codegen.watch",
+)
+
+
+def loaded_modules(module: str) -> set[str]:
+    result = subprocess.run(
+        [sys.executable, "-c", f"import sys, {module}; print(*sys.modules)"],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=ROOT,
+    )
+    return set(result.stdout.split())
+
+
+def deferred_imports(module: str) -> list[str]:
+    loaded = loaded_modules(module)
+    return [name for name in DEFERRED_MODULES if name in loaded and name != module]
+
+
+def import_times(module: str) -> dict[str, int]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=ROOT,
+    )
+    times: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if m := re.match(r"import time:\s+\d+ \|\s+(\d+) \| *(\S+)", line):
+            times[m.group(2)] = int(m.group(1))
+    return times
+
+
+def import_time_ms(module: str, runs: int) -> float:
+    return min(import_times(module)[module] for _ in range(runs)) / 1000
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="check what the entry points import")
+    parser.add_argument(
+        "--runs", type=int, default=3, help="imports to time, the fastest counts"
+    )
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        help="also fail when an entry point takes longer to import",
+    )
+    args = parser.parse_args()
+
+    errors = []
+    for module in ENTRY_POINTS:
+        errors += [f"{module} imports {name}" for name in deferred_imports(module)]
+        elapsed_ms = import_time_ms(module, args.runs)
+        print(f"{module}: {elapsed_ms:.0f}ms")
+        if args.budget_ms is not None and elapsed_ms > args.budget_ms:
+            errors.append(f"{module} takes {elapsed_ms:.0f}ms to import")
+    for error in errors:
+        print(error, file=sys.stderr)
+    sys.exit(1 if errors else 0)
@@ -0,0 +1,210 @@
+import json
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from functools import cache
+from hashlib import sha256
+from pathlib import Path
+
+from .cache import default_cache_dir, write_if_changed
+
+QMK_KEYCODES_PATH = Path(__file__).with_name("qmk-keycodes.txt")
+DATABASE_SOURCES = (
+    Path(__file__),
+    Path(__file__).with_name("zmk_keycodes.py"),
+    QMK_KEYCODES_PATH,
+)
+
+# plain text glyphs for key labels, markup-only labels live with the renderer
+KEY_LABELS = {
+    "CMD": "⌘",
+    "ALT": "⌥",
+    "SUPER": "◆",
+    "rCMD": "⌘",
+    "rSHIFT": "⇧",
+    "rALT": "⌥",
+    "rSUPER": "◆",
+    "SPACE": "⎵",
+    "TAB": "⇥",
+    "PIPE": "|",
+    "APP": "☰",
+    "LEFT": "←",
+    "RIGHT": "→",
+    "UP": "↑",
+    "DOWN": "↓",
+    "PG_UP": "⇞",
+    "PG_DN": "⇟",
+    "HOME": "⇱",
+    "END": "⇲",
+}
+
+
+@dataclass
+class KeycodeDatabase:
+    zmk_keycodes: frozenset[str]
+    zmk_aliases: dict[str, str]
+    qmk_keycodes: dict[str, str]
+    qmk_basic_keycodes: frozenset[str]
+    labels: dict[str, str]
+    _zmk_found: dict[str, str | None] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+
+    def zmk(self, name: str) -> str:
+        try:
+            found = self._zmk_found[name]
+        except KeyError:
+            upper = name.upper()
+            if upper in self.zmk_keycodes:
+                found = upper
+            else:
+                found = self.zmk_aliases.get(name)
+                if found is None:
+                    found = self.zmk_aliases.get(upper)
+            self._zmk_found[name] = found
+
+        if found is None:
+            raise KeyError(name.upper())
+        return found
+
+    def qmk(self, name: str) -> str:
+        folded = name.lower()
+        if folded in self.qmk_keycodes:
+            return self.qmk_keycodes[folded]
+        if "kc_" + folded in self.qmk_keycodes:
+            return self.qmk_keycodes["kc_" + folded]
+        raise KeyError(f"unknown QMK keycode: {name}")
+
+    def label(self, name: str, default: str | None = None):
+        return self.labels.get(name, default)
+
+    def to_json(self, sources_digest: str):
+        return json.dumps(
+            {
+                "stamp": sources_stamp(),
+                "sources": sources_digest,
+                "zmk_keycodes": sorted(self.zmk_keycodes),
+                "zmk_aliases": self.zmk_aliases,
+                "qmk_keycodes": self.qmk_keycodes,
+                "qmk_basic_keycodes": sorted(self.qmk_basic_keycodes),
+                "labels": self.labels,
+            },
+            ensure_ascii=False,
+            indent=1,
+        ).encode()
+
+    @classmethod
+    def From_json(cls, data: dict):
+        return cls(
+            zmk_keycodes=frozenset(data["zmk_keycodes"]),
+            zmk_aliases=data["zmk_aliases"],
+            qmk_keycodes=data["qmk_keycodes"],
+            qmk_basic_keycodes=frozenset(data["qmk_basic_keycodes"]),
+            labels=data["labels"],
+        )
+
+    @classmethod
+    def Compile(cls):
+        from .zmk_keycodes import ZMK_KEYCODES, ZMK_KEYCODES_ALIASES
+
+        with open(QMK_KEYCODES_PATH) as f:
+            qmk_keycodes, qmk_basic_keycodes = parse_qmk_keycodes(f)
+
+        return cls(
+            zmk_keycodes=frozenset(ZMK_KEYCODES),
+            zmk_aliases=dict(ZMK_KEYCODES_ALIASES),
+            qmk_keycodes=qmk_keycodes,
+            qmk_basic_keycodes=frozenset(qmk_basic_keycodes),
+            labels=dict(KEY_LABELS),
+        )
+
+    @classmethod
+    def Load(cls, path: Path | None = None, use_cache: bool = True):
+        if not use_cache:
+            return cls.Compile()
+
+        path = path or default_cache_dir() / "keycodes.json"
+        try:
+            data = json.loads(path.read_bytes())
+            # unchanged mtimes and sizes spare hashing the sources on every start
+            if data["stamp"] == sources_stamp():
+                return cls.From_json(data)
+            digest = sources_digest()
+            if data["sources"] == digest:
+                database = cls.From_json(data)
+                database.save(path, digest)
+                return database
+        except (FileNotFoundError, ValueError, KeyError):
+            digest = sources_digest()
+
+        database = cls.Compile()
+        database.save(path, digest)
+        return database
+
+    def save(self, path: Path, digest: str | None = None):
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            write_if_changed(path, self.to_json(digest or sources_digest()))
+        except OSError:
+            pass
+
+
+def sources_stamp():
+    stamp = []
+    for path in DATABASE_SOURCES:
+        stat = path.stat()
+        stamp.append([path.name, stat.st_mtime_ns, stat.st_size])
+    return stamp
+
+
+def sources_digest():
+    h = sha256()
+    for path in DATABASE_SOURCES:
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def parse_qmk_keycodes(lines: Iterable[str]):
+    mapping: dict[str, str] = {}
+    basic_keycodes: set[str] = set()
+    section = ""
+
+    for line in lines:
+        line = line.strip()
+
+        if m := re.match(r"\#+ +(.+)", line):
+            section = m.group(1)
+
+        elif line and not line.startswith("#"):
+            if "\t" in line:
+                left, right = line.split("\t")
+            else:
+                left, right = line, ""
+
+            left = left.split()
+            right = right.split()
+            shortest = min(left, key=len)
+            for k in left + right:
+                mapping[k.lower()] = shortest
+
+            if "basic" in section:
+                basic_keycodes |= set(left)
+
+    return mapping, basic_keycodes
+
+
+_database_options: tuple[Path | None, bool] = (None, True)
+
+
+def configure_keycode_database(
+    cache_dir: str | Path | None = None, use_cache: bool = True
+):
+    global _database_options
+    path = Path(cache_dir) / "keycodes.json" if cache_dir else None
+    _database_options = path, use_cache
+    keycode_database.cache_clear()
+
+
+@cache
+def keycode_database():
+    return KeycodeDatabase.Load(*_database_options)
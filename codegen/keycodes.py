@@ -0,0 +1,53 @@
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import cache, lru_cache
+
+from .flyweight import Interned
+
+MODIFIERS_RE = r"([rl]?(ALT|CMD|CTRL|SHIFT))"
+MODIFIER_PREFIX_RE = re.compile(MODIFIERS_RE + r"\+", re.IGNORECASE)
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class KeycodeExpr(Interned):
+    mods: tuple[str, ...]
+    key: str
+
+    def map(
+        self, key_f: Callable[[str], str], mod_f: Callable[[str], str] | None = None
+    ):
+        return KeycodeExpr(tuple(map(mod_f or key_f, self.mods)), key_f(self.key))
+
+    def format_call(self):
+        return "(".join((*self.mods, self.key)) + ")" * len(self.mods)
+
+    def __iter__(self):
+        return iter((*self.mods, self.key))
+
+
+# `CTRL+SHIFT+A`, as written in the markdown tables
+@lru_cache(maxsize=4096)
+def parse_keycode(text: str) -> KeycodeExpr:
+    mods: list[str] = []
+    i = 0
+    while m := MODIFIER_PREFIX_RE.match(text, i):
+        mods.append(m.group(1))
+        i = m.end()
+    return KeycodeExpr(tuple(mods), text[i:])
+
+
+@cache
+def call_pattern(functions: tuple[str, ...]):
+    return re.compile(r"^\s*(" + r"|".join(functions) + r")\s*\(\s*(.+)\s*\)\s*$")
+
+
+# `LS(LC(A))`, as used by the firmware keycodes
+@lru_cache(maxsize=4096)
+def parse_keycode_call(text: str, functions: tuple[str, ...]) -> KeycodeExpr:
+    pattern = call_pattern(functions)
+    mods: list[str] = []
+    while m := pattern.match(text):
+        mods.append(m.group(1))
+        text = m.group(2)
+    return KeycodeExpr(tuple(mods), text)
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import mmap
+import re
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+MD_TOKENS_RE = re.compile(
+    rb"^(?P<depth>#+) +(?P<title>[^\r\n]+)"
+    rb"|^(?P<table>(?:[ \t]*[|+][^\r\n]+(?:\r?\n|\Z))+)",
+    re.MULTILINE,
+)
+
+
+@dataclass(frozen=True)
+class MdHeading:
+    offset: int
+    depth: int
+    title: str
+
+
+@dataclass(frozen=True)
+class MdBlock:
+    offset: int
+    end: int
+
+
+class MarkdownIndex:
+    def __init__(self, data: bytes | mmap.mmap) -> None:
+        self._data = data
+        self.headings: list[MdHeading] = []
+        self.tables: list[MdBlock] = []
+
+        for m in MD_TOKENS_RE.finditer(data):
+            if m.group("table") is not None:
+                self.tables.append(MdBlock(m.start(), m.end()))
+            else:
+                self.headings.append(
+                    MdHeading(
+                        m.start(),
+                        len(m.group("depth")),
+                        m.group("title").decode().rstrip(),
+                    )
+                )
+
+        self._heading_offsets = [h.offset for h in self.headings]
+        self._table_offsets = [t.offset for t in self.tables]
+
+    @classmethod
+    def Parse(cls, text: MarkdownIndex | str | bytes | Iterable[str]):
+        if isinstance(text, MarkdownIndex):
+            return text
+        if isinstance(text, str):
+            return cls(text.encode())
+        if isinstance(text, bytes):
+            return cls(text)
+        return cls("".join(text).encode())
+
+    @classmethod
+    def Open(cls, filename: str):
+        with open(filename, "rb") as f:
+            try:
+                return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            except ValueError:
+                return cls(f.read())
+
+    @property
+    def data(self) -> bytes:
+        return bytes(self._data)
+
+    def block_bytes(self, block: MdBlock) -> bytes:
+        return self._data[block.offset : block.end]
+
+    def block_lines(self, block: MdBlock) -> list[str]:
+        return [
+            line.strip("\t\r\n")
+            for line in self.block_bytes(block).decode().splitlines()
+        ]
+
+    def find_section(self, section_re: str) -> tuple[int, int] | None:
+        for i, heading in enumerate(self.headings):
+            if re.search(section_re, heading.title, flags=re.IGNORECASE):
+                for next_heading in self.headings[i + 1 :]:
+                    if next_heading.depth <= heading.depth:
+                        return heading.offset, next_heading.offset
+                return heading.offset, len(self._data)
+        return None
+
+    def section_tables(self, section_re: str) -> Iterator[tuple[str, MdBlock]]:
+        section = self.find_section(section_re)
+        if section is None:
+            return
+
+        start, end = section
+        first_heading = bisect_right(self._heading_offsets, start)
+        for block in self.tables[
+            bisect_left(self._table_offsets, start) : bisect_left(
+                self._table_offsets, end
+            )
+        ]:
+            i = bisect_left(self._heading_offsets, block.offset) - 1
+            subsection = self.headings[i].title if i >= first_heading else ""
+            yield subsection, block
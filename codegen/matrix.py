@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import Callable, Hashable, Iterator, Mapping, Sequence
+from dataclasses import dataclass, field
+from itertools import chain
+from typing import (
+    Generic,
+    TypeVar,
+)
+
+from .asciitables import TableShape
+from .source import Key, Keymap, ReshapePlan
+
+L = TypeVar("L", bound=Hashable)
+
+ID_TYPECODE = "I"
+
+
+@dataclass
+class KeySymbols:
+    # keys are interned flyweights, so the ids can follow their identity
+    ids: dict[Key, int] = field(default_factory=dict)
+    keys: list[Key] = field(default_factory=list)
+
+    def intern(self, key: Key) -> int:
+        try:
+            return self.ids[key]
+        except KeyError:
+            i = self.ids[key] = len(self.keys)
+            self.keys.append(key)
+            return i
+
+    def intern_all(self, keys: Sequence[Key]) -> list[int]:
+        for key in dict.fromkeys(keys):
+            if key not in self.ids:
+                self.intern(key)
+        return list(map(self.ids.__getitem__, keys))
+
+    def copy(self):
+        return KeySymbols(dict(self.ids), list(self.keys))
+
+    def __getitem__(self, i: int) -> Key:
+        return self.keys[i]
+
+    def __len__(self):
+        return len(self.keys)
+
+
+@dataclass
+class KeymapMatrix(Generic[L]):
+    layer_names: list[L]
+    cells: array[int]
+    keys: KeySymbols
+    table_shape: TableShape
+
+    @property
+    def width(self):
+        return len(self.table_shape)
+
+    def __len__(self):
+        return len(self.layer_names)
+
+    def row(self, i: int) -> memoryview:
+        w = self.width
+        return memoryview(self.cells)[i * w : (i + 1) * w]
+
+    def layer(self, name: L) -> memoryview:
+        return self.row(self.layer_names.index(name))
+
+    def rows(self) -> Iterator[tuple[L, memoryview]]:
+        for i, name in enumerate(self.layer_names):
+            yield name, self.row(i)
+
+    def identical_layers(self) -> list[list[L]]:
+        groups: dict[bytes, list[L]] = {}
+        for name, row in self.rows():
+            groups.setdefault(row.tobytes(), []).append(name)
+        return list(groups.values())
+
+    def substitute(self, table: list[int], keys: KeySymbols) -> KeymapMatrix[L]:
+        return KeymapMatrix(
+            list(self.layer_names),
+            array(ID_TYPECODE, map(table.__getitem__, self.cells)),
+            keys,
+            self.table_shape,
+        )
+
+    def map_keys(self, f: Callable[[Key], Key]) -> KeymapMatrix[L]:
+        # unchanged keys keep their ids, so variants compare row by row
+        keys = self.keys.copy()
+        return self.substitute(keys.intern_all(list(map(f, self.keys.keys))), keys)
+
+    def map_strings(self, f: Callable[[str], str]) -> KeymapMatrix[L]:
+        # a symbol table for the tap and hold strings, each is mapped once
+        strings: dict[tuple[type, str], str] = {}
+
+        def mapped(s: str):
+            k = type(s), s
+            try:
+                return strings[k]
+            except KeyError:
+                v = strings[k] = f(s)
+                return v
+
+        def map_key(key: Key):
+            tap = key.tap if key.tap is None else mapped(key.tap)
+            hold = key.hold if key.hold is None else mapped(key.hold)
+            if tap is key.tap and hold is key.hold:
+                return key
+            return Key(tap, hold)
+
+        return self.map_keys(map_key)
+
+    def changes(self, variant: KeymapMatrix[L], i: int) -> dict[int, Key]:
+        # variant comes from map_keys or map_strings on this matrix
+        row, variant_row = self.row(i), variant.row(i)
+        if row == variant_row:
+            return {}
+        return {
+            position: variant.keys[b]
+            for position, (a, b) in enumerate(zip(row, variant_row))
+            if a != b
+        }
+
+    def reshape_by(self, plan: ReshapePlan, default: Key) -> KeymapMatrix[L]:
+        # gather whole columns at once with strided slices, all layers together
+        w, new_w = self.width, len(plan.indices)
+        cells = array(ID_TYPECODE, [self.keys.intern(default)]) * (len(self) * new_w)
+        for j, i in enumerate(plan.indices):
+            if i >= 0:
+                cells[j::new_w] = self.cells[i::w]
+        return KeymapMatrix(
+            list(self.layer_names), cells, self.keys, dict(plan.table_shape)
+        )
+
+    def to_layers(self) -> dict[L, list[Key]]:
+        keys = list(map(self.keys.keys.__getitem__, self.cells))
+        w = self.width
+        return {
+            name: keys[i * w : (i + 1) * w] for i, name in enumerate(self.layer_names)
+        }
+
+    def to_keymap(self) -> Keymap[L, Key]:
+        return Keymap(self.to_layers(), dict(self.table_shape))
+
+    @classmethod
+    def From_layers(
+        cls, layers: Mapping[L, list[Key]], table_shape: TableShape | None = None
+    ) -> KeymapMatrix[L]:
+        if table_shape is None:
+            width = len(next(iter(layers.values()), []))
+            table_shape = {(0, c): (1, 1) for c in range(width)}
+        if any(len(layer) != len(table_shape) for layer in layers.values()):
+            raise ValueError("layer does not match the keymap table shape")
+        keys = KeySymbols()
+        cells = array(ID_TYPECODE, keys.intern_all(list(chain(*layers.values()))))
+        return cls(list(layers), cells, keys, dict(table_shape))
+
+    @classmethod
+    def From_keymap(cls, keymap: Keymap[L, Key]) -> KeymapMatrix[L]:
+        return cls.From_layers(keymap.layers, keymap.table_shape)
@@ -3,88 +3,131 @@ from __future__ import annotations
 import logging
 import re
 from dataclasses import dataclass, replace
+from functools import cache
+from io import StringIO
 from itertools import chain, groupby
 from os.path import abspath, dirname
-from os.path import join as path_join
-from typing import Callable, Iterable, Mapping, Optional, Union
+from typing import Any, Callable, Iterable, Mapping, Optional, Sequence, TextIO, Union
 
-from jinja2 import Environment, FileSystemLoader
-
-from .asciitables import Table, cjust, format_boxed_table, format_table
+from .asciitables import AlignmentPlan
+from .flyweight import Interned
+from .keycode_db import KeycodeDatabase, keycode_database
+from .keycodes import parse_keycode, parse_keycode_call
 from .source import (
     Key,
     Keymap,
     LayerName,
     join_layer_name,
-    split_mods,
+    layer_diagram,
+    split_layer_name,
 )
-from .zmk import LayerBase
+from .zmk import BindingTranslatorBase, LayerBase
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class QmkLayoutModel:
+    layers: list[Layer]
+    layer_oses: dict[str, list[str]]
+    uc_modes: dict[str, str]
+    custom_LTs: set[CustomLT]
+    custom_shifts: set[CustomShift]
+
+    @classmethod
+    def Build(
+        cls,
+        multi_os_layers: Iterable[tuple[tuple[str, str], Sequence[Key]]],
+        aliases_for_os: Callable[
+            [str],
+            dict[str, str | QmkBinding | Callable[[re.Match[str]], str | QmkBinding]],
+        ]
+        | None = None,
+    ):
+        binding_layers = [
+            Layer(
+                join_layer_name(source_layer, [os]),
+                list(map(BindingTranslator.For_os(aliases_for_os, os), keys)),
+                source_layer,
+            )
+            for (source_layer, os), keys in multi_os_layers
+        ]
+
+        base_name = binding_layers[0].source_layer
+        uc_modes_by_base = {
+            Layer.Shorten_name(
+                join_layer_name(base_name, ["mac"])
+            ): "UNICODE_MODE_MACOS",
+            Layer.Shorten_name(
+                join_layer_name(base_name, ["linux"])
+            ): "UNICODE_MODE_WINDOWS",
+            Layer.Shorten_name(
+                join_layer_name(base_name, ["win"])
+            ): "UNICODE_MODE_LINUX",
+        }
+
+        binding_layers = Layer.Deduplicate(binding_layers, exceptions=("base",))
+        layers = [
+            layer.rename_layers_in_bindings(layer.Shorten_name)
+            for layer in binding_layers
+        ]
+        layer_oses = {
+            short.name: split_layer_name(layer.name)[1]
+            for short, layer in zip(layers, binding_layers)
+        }
+
+        all_keycodes = set(chain.from_iterable(layer.bindings for layer in layers))
+        return cls(
+            layers,
+            layer_oses,
+            uc_modes_by_base,
+            set(k for k in all_keycodes if isinstance(k, CustomLT)),
+            set(k for k in all_keycodes if isinstance(k, CustomShift)),
+        )
+
+
 def generate_qmk_layout_code(
     keymap: Keymap[str, Key],
     titles: Mapping[str, str],
-    multi_os_layers: Iterable[tuple[tuple[str, str], list[Key]]],
+    multi_os_layers: Iterable[tuple[tuple[str, str], Sequence[Key]]],
+    **kwargs: Any,
+) -> str:
+    sink = StringIO()
+    write_qmk_layout_code(sink, keymap, titles, multi_os_layers, **kwargs)
+    return sink.getvalue()
+
+
+def write_qmk_layout_code(
+    sink: TextIO,
+    keymap: Keymap[str, Key],
+    titles: Mapping[str, str],
+    multi_os_layers: Iterable[tuple[tuple[str, str], Sequence[Key]]],
     *,
     layout_name: Optional[str] = "LAYOUT",
     aliases_for_os: Callable[
         [str], dict[str, str | QmkBinding | Callable[[re.Match[str]], str | QmkBinding]]
     ]
     | None = None,
-) -> str:
-    binding_layers = [
-        Layer(
-            join_layer_name(source_layer, [os]),
-            list(
-                map(
-                    BindingTranslator(
-                        aliases_for_os(os) if callable(aliases_for_os) else {}
-                    ),
-                    keys,
-                )
-            ),
-            source_layer,
-        )
-        for (source_layer, os), keys in multi_os_layers
-    ]
+):
+    model = QmkLayoutModel.Build(multi_os_layers, aliases_for_os)
+    binding_layers = model.layers
 
-    base_name = binding_layers[0].source_layer
-    uc_modes_by_base = {
-        Layer.Shorten_name(join_layer_name(base_name, ["mac"])): "UNICODE_MODE_MACOS",
-        Layer.Shorten_name(
-            join_layer_name(base_name, ["linux"])
-        ): "UNICODE_MODE_WINDOWS",
-        Layer.Shorten_name(join_layer_name(base_name, ["win"])): "UNICODE_MODE_LINUX",
-    }
-
-    binding_layers = [
-        layer.rename_layers_in_bindings(layer.Shorten_name)
-        for layer in Layer.Deduplicate(binding_layers, exceptions=("base",))
-    ]
+    def binding_cells(layer: Layer):
+        return [f"{binding}," for binding in layer.bindings]
+
+    alignment = AlignmentPlan.Compile(
+        keymap.table_shape, map(binding_cells, binding_layers), sep=" ", pad=""
+    )
 
     def format_qmk_layer(layer: Layer, with_comment: bool = True) -> str:
-        bindings_str = format_table(
-            Table.Shape(
-                keymap.table_shape, [f"{binding}," for binding in layer.bindings], ""
-            ),
-            sep=" ",
-            pad="",
-            just=str.ljust,
-        )
+        bindings_str = alignment.format_lines(binding_cells(layer), str.ljust)
         args = indent_lines(
-            "\n".join(layer.rstrip() for layer in bindings_str.splitlines()).rstrip(
-                " ,"
-            ),
+            "\n".join(line.rstrip() for line in bindings_str).rstrip(" ,"),
             "\t",
         )
         if with_comment:
-            table = Table.Shape(
-                keymap.table_shape, keymap.layers[layer.source_layer], ""
-            )
-            formatted = format_boxed_table(
-                table.map_contents(lambda x: cjust(str(x).strip(), 5))
+            formatted = layer_diagram(
+                keymap.table_shape, keymap.layers[layer.source_layer]
             )
             comment = f"/* {titles[layer.source_layer]}\n{formatted} */\n"
         else:
@@ -102,9 +145,22 @@ def generate_qmk_layout_code(
                     format_qmk_layer(layer, with_comment=i == 0),
                 )
 
-    all_keycodes = set(chain.from_iterable(layer.bindings for layer in binding_layers))
-    customLTs = set(k for k in all_keycodes if isinstance(k, CustomLT))
-    customShifts = set(k for k in all_keycodes if isinstance(k, CustomShift))
+    template = qmk_template().generate(
+        layer_blocks=dict(make_layer_blocks()),
+        uc_modes=(
+            sorted((fix_c_name(k), v) for k, v in model.uc_modes.items())
+            if model.uc_modes
+            else []
+        ),
+        custom_shifts=sorted(model.custom_shifts),
+        custom_LTs=sorted(model.custom_LTs),
+    )
+    sink.writelines(template)
+
+
+@cache
+def qmk_template():
+    from jinja2 import Environment, FileSystemLoader
 
     env = Environment(
         "/*%",
@@ -115,17 +171,7 @@ def generate_qmk_layout_code(
         "*/",
         loader=FileSystemLoader(abspath(dirname(__file__))),
     )
-    template = env.get_template("qmk.template.h")
-    return template.render(
-        layer_blocks=dict(make_layer_blocks()),
-        uc_modes=(
-            sorted((fix_c_name(k), v) for k, v in uc_modes_by_base.items())
-            if uc_modes_by_base
-            else []
-        ),
-        custom_shifts=sorted(customShifts),
-        custom_LTs=sorted(customLTs),
-    )
+    return env.get_template("qmk.template.h")
 
 
 def indent_lines(s: str, indent: str = "\t"):
@@ -136,8 +182,8 @@ def fix_c_name(name: str):
     return re.sub(r"[^A-Za-z0-9_]", "_", name)
 
 
-@dataclass(frozen=True, order=True)
-class CustomShift:
+@dataclass(frozen=True, slots=True, eq=False)
+class CustomShift(Interned):
     normal: str
     shifted: str
 
@@ -145,8 +191,8 @@ class CustomShift:
         return self.normal
 
 
-@dataclass(frozen=True, order=True)
-class QmkKey:
+@dataclass(frozen=True, slots=True, eq=False)
+class QmkKey(Interned):
     value: str
     param: Optional[str] = None
 
@@ -161,8 +207,8 @@ class QmkModtap(QmkKey):
     pass
 
 
-@dataclass(frozen=True, order=True)
-class QmkLT:
+@dataclass(frozen=True, slots=True, eq=False)
+class QmkLT(Interned):
     layer: str
     keycode: str
 
@@ -170,23 +216,23 @@ class QmkLT:
         return f"LT({self.layer},{self.keycode})"
 
 
-@dataclass(frozen=True)
-class QmkMO:
+@dataclass(frozen=True, slots=True, eq=False)
+class QmkMO(Interned):
     layer: str
 
     def __str__(self):
         return f"MO({self.layer})"
 
 
-@dataclass(frozen=True)
-class QmkTO:
+@dataclass(frozen=True, slots=True, eq=False)
+class QmkTO(Interned):
     layer: str
 
     def __str__(self):
         return f"TO({self.layer})"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True, eq=False)
 class CustomLT(QmkLT):
     @property
     def identifier(self):
@@ -213,32 +259,10 @@ class Layer(LayerBase[QmkBinding]):
 
 
 class QmkKeycodes:
-    def __init__(self, fn: str = path_join(dirname(__file__), "qmk-keycodes.txt")):
-        self.basic_keycodes: set[str] = set()
-        self.mapping: dict[str, str] = dict()
-
-        section = ""
-
-        for line in open(fn):
-            line = line.strip()
-
-            if m := re.match(r"\#+ +(.+)", line):
-                section = m.group(1)
-
-            elif line and not line.startswith("#"):
-                if "\t" in line:
-                    left, right = line.split("\t")
-                else:
-                    left, right = line, ""
-
-                left = left.split()
-                right = right.split()
-                shortest = min(left, key=len)
-                for k in left + right:
-                    self.mapping[k.lower()] = shortest
-
-                if "basic" in section:
-                    self.basic_keycodes |= set(left)
+    def __init__(self, database: KeycodeDatabase | None = None):
+        self.database = database or keycode_database()
+        self.basic_keycodes = self.database.qmk_basic_keycodes
+        self.mapping = self.database.qmk_keycodes
 
         self.MODIFIERS = {
             self.mapping["kc_" + v.lower()]: v
@@ -268,37 +292,28 @@ class QmkKeycodes:
             ]
         }
 
-        self.MODIFIERS_RE = re.compile(
-            r"^\s*(" + r"|".join(self.MODIFIERS.values()) + r")\s*\(\s*(.+)\s*\)\s*$"
-        )
+        self.MODIFIER_FUNCTIONS = tuple(self.MODIFIERS.values())
 
     def is_simple_keycode(self, kc: str) -> bool:
         return kc in self.basic_keycodes
 
     def split_modified(self, k: str) -> list[str]:
-        if m := self.MODIFIERS_RE.match(k):
-            return [m.group(1), *self.split_modified(m.group(2))]
-        else:
-            return [
-                k,
-            ]
+        return list(parse_keycode_call(k, self.MODIFIER_FUNCTIONS))
 
     def _base_lookup(self, k: str) -> str:
-        if k.lower() in self.mapping:
-            return self.mapping[k.lower()]
-        if "kc_" + k.lower() in self.mapping:
-            return self.mapping["kc_" + k.lower()]
-        raise KeyError(f"unknown QMK keycode: {k}")
+        return self.database.qmk(k)
 
     def lookup(self, k: str) -> str:
         try:
-            mods, kc = split_mods(k)
-            kc = self._base_lookup(kc)
-            mods = [self.MODIFIERS.get(self._base_lookup(mod)) for mod in mods]
+            expr = parse_keycode(k)
+            kc = self._base_lookup(expr.key)
+            mods = [self.MODIFIERS.get(self._base_lookup(mod)) for mod in expr.mods]
             return "(".join(map(str, (*mods, kc))) + ")" * len(mods)
         except KeyError:
-            *mods, kc = self.split_modified(k)
-            if kc.lower() in self.mapping:
+            if (
+                parse_keycode_call(k, self.MODIFIER_FUNCTIONS).key.lower()
+                in self.mapping
+            ):
                 return k
             raise KeyError(f"unknown QMK keycode: {k}")
 
@@ -306,31 +321,22 @@ class QmkKeycodes:
         return self.lookup(k)
 
 
-QMK_KEYCODES = QmkKeycodes()
+@cache
+def qmk_keycodes():
+    return QmkKeycodes()
 
 
-class BindingTranslator:
-    def __init__(
-        self,
-        aliases: Mapping[
-            str, str | QmkBinding | Callable[[re.Match[str]], str | QmkBinding]
-        ],
-    ) -> None:
-        self.aliases: dict[str, str | QmkBinding] = {}
-        self.callable_aliases: dict[
-            re.Pattern[str], Callable[[re.Match[str]], str | QmkBinding]
-        ] = {}
-        for k, v in aliases.items():
-            if callable(v):
-                self.callable_aliases[re.compile(k)] = v
-            else:
-                self.aliases[k] = v
+class BindingTranslator(BindingTranslatorBase[QmkBinding]):
+    def is_binding(self, found: object):
+        return isinstance(found, QmkBinding)
+
+    def translate_key(self, key: Key):
+        keycodes = qmk_keycodes()
 
-    def __call__(self, key: Key):
         def f(s: str):
             t = self.follow_aliases(s)
             try:
-                return QMK_KEYCODES[t]
+                return keycodes[t]
             except KeyError:
                 return t
 
@@ -340,7 +346,7 @@ class BindingTranslator:
                 return t
             else:
                 try:
-                    return QmkKey(QMK_KEYCODES[t])
+                    return QmkKey(keycodes[t])
                 except KeyError:
                     logger.warning(f"not implemented {t!r}")
                     return QmkKey("KC_NO")
@@ -351,7 +357,7 @@ class BindingTranslator:
                 if key.tap:
                     tap = g(key.tap)
                     if isinstance(tap, QmkKey):
-                        if not QMK_KEYCODES.is_simple_keycode(tap.value):
+                        if not keycodes.is_simple_keycode(tap.value):
                             return CustomLT(layer, tap.value)
                         else:
                             return QmkLT(layer, tap.value)
@@ -365,7 +371,7 @@ class BindingTranslator:
                 if key.tap:
                     tap = g(key.tap)
                     if isinstance(tap, QmkKey):
-                        return QmkModtap(QMK_KEYCODES.MODTAPS[hold], tap.value)
+                        return QmkModtap(keycodes.MODTAPS[hold], tap.value)
                     raise ValueError(f"cannot nodtap for {hold}, {tap}")
                 else:
                     return QmkKey(hold)
@@ -378,30 +384,9 @@ class BindingTranslator:
 
         return QmkKey("KC_NO")
 
-    def follow_aliases(self, txt: str):
-        seen: set[str] = set()
-        while txt not in seen:
-            try:
-                found = self.aliases[txt]
-            except KeyError:
-                for k, v in self.callable_aliases.items():
-                    if m := k.match(txt):
-                        found = v(m)
-                        break
-                else:
-                    break
-
-            if isinstance(found, QmkBinding):
-                return found
-            else:
-                seen.add(found)
-                txt = found
-                break
-        return txt
-
     def translate_binding(self, txt: str):
         found = self.follow_aliases(txt)
         if isinstance(found, QmkBinding):
             return found
         else:
-            return QmkKey(QMK_KEYCODES.lookup(found))
+            return QmkKey(qmk_keycodes().lookup(found))
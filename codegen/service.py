@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Mapping
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Generic, TypeVar
+
+from .cache import bytes_digest
+from .markdown import MarkdownIndex
+from .source import (
+    Key,
+    Keymap,
+    KeymapParser,
+    extract_os_specifics_from_md,
+    replace_layer_tables,
+)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+logger = logging.getLogger(__name__)
+
+BuildTarget = Callable[
+    [Keymap[str, Key], Mapping[str, str], dict[str, dict[str, str]], Mapping[str, Any]],
+    bytes,
+]
+
+
+class LruCache(Generic[K, V]):
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._items: OrderedDict[K, V] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+        return None
+
+    def put(self, key: K, value: V):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def get_or_create(self, key: K, factory: Callable[[], V]) -> V:
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self.put(key, value)
+        return value
+
+
+@dataclass(frozen=True)
+class ParsedMarkdown:
+    markdown: bytes
+    keymap: Keymap[str, Key]
+    titles: dict[str, str]
+    os_specifics: dict[str, dict[str, str]]
+
+
+class KeymapService:
+    def __init__(
+        self, build_target: BuildTarget, max_keymaps: int = 16, max_outputs: int = 256
+    ) -> None:
+        self.build_target = build_target
+        self.keymaps: LruCache[str, ParsedMarkdown] = LruCache(max_keymaps)
+        self.outputs: LruCache[tuple[str, str], bytes] = LruCache(max_outputs)
+        self._parser = KeymapParser()
+        # interned keys and nodes compare by identity and their memos are not
+        # thread safe, so parsing and generation run one request at a time
+        self._generate_lock = threading.Lock()
+
+    def parse(self, markdown: bytes) -> tuple[str, ParsedMarkdown]:
+        def parse_markdown():
+            index = MarkdownIndex(markdown)
+            with self._generate_lock:
+                keymap, titles = self._parser.parse(index)
+                os_specifics = dict(extract_os_specifics_from_md(index))
+            return ParsedMarkdown(markdown, keymap, titles, os_specifics)
+
+        digest = bytes_digest(markdown)
+        return digest, self.keymaps.get_or_create(digest, parse_markdown)
+
+    def handle(self, request: Mapping[str, Any]) -> dict[str, Any]:
+        if not isinstance(request, dict):
+            raise TypeError("request must be a JSON object")
+        tables = request.get("tables", {})
+        if not isinstance(tables, dict) or not all(
+            isinstance(k, str) and isinstance(v, str) for k, v in tables.items()
+        ):
+            raise TypeError("tables must map layer names to table strings")
+        targets = request.get("targets", [])
+        if not isinstance(targets, list) or not all(
+            isinstance(t, dict) for t in targets
+        ):
+            raise TypeError("targets must be a list of option objects")
+
+        if "markdown" in request:
+            markdown = str(request["markdown"]).encode()
+        elif "base" in request:
+            base = self.keymaps.get(request["base"])
+            if base is None:
+                raise KeyError(f"unknown base document: {request['base']}")
+            markdown = replace_layer_tables(base.markdown, tables)
+        else:
+            raise ValueError("request needs either a markdown or a base document")
+
+        digest, parsed = self.parse(markdown)
+
+        def build(options: Mapping[str, Any]):
+            with self._generate_lock:
+                return self.build_target(
+                    parsed.keymap, parsed.titles, parsed.os_specifics, options
+                )
+
+        def artifact(options: Mapping[str, Any]):
+            data = self.outputs.get_or_create(
+                (digest, json.dumps(options, sort_keys=True)), lambda: build(options)
+            )
+            return {**options, "content": data.decode()}
+
+        return {
+            "digest": digest,
+            "artifacts": [artifact(options) for options in targets],
+        }
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    service: KeymapService
+
+    def do_POST(self):
+        if self.path != "/generate":
+            self.send_error(404)
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            response = self.service.handle(json.loads(self.rfile.read(length)))
+            status = 200
+        except KeyError as e:
+            response = {"error": str(e.args[0]) if e.args else "missing key"}
+            status = 400
+        except (ValueError, TypeError) as e:
+            response = {"error": str(e)}
+            status = 400
+        except Exception:
+            logger.exception("failed to handle %s request", self.path)
+            response = {"error": "internal error"}
+            status = 500
+
+        body = json.dumps(response).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def make_server(service: KeymapService, host: str = "127.0.0.1", port: int = 8765):
+    handler = type("Handler", (ServiceRequestHandler,), {"service": service})
+    return ThreadingHTTPServer((host, port), handler)
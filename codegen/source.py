@@ -1,24 +1,27 @@
 import re
 from collections import defaultdict
 from dataclasses import dataclass, replace
-from functools import partial
-from itertools import tee
+from functools import cache, lru_cache
+from hashlib import blake2b
 from operator import __not__
 from typing import (
     Callable,
     Collection,
     Generic,
+    Hashable,
     Iterable,
     Mapping,
     Optional,
     Sequence,
     TypeVar,
     cast,
+    overload,
 )
 
-from .asciitables import Table, TableShape
-
-MODIFIERS_RE = r"([rl]?(ALT|CMD|CTRL|SHIFT))"
+from .asciitables import Table, TableShape, cjust, format_boxed_table
+from .flyweight import Interned
+from .keycodes import MODIFIERS_RE, parse_keycode
+from .markdown import MarkdownIndex
 
 
 class LayerName(str):
@@ -26,8 +29,8 @@ class LayerName(str):
         return f"Layer({super().__repr__()})"
 
 
-@dataclass
-class Key:
+@dataclass(frozen=True, slots=True, eq=False)
+class Key(Interned):
     tap: str | None = None
     hold: str | None = None
 
@@ -69,14 +72,14 @@ class Keymap(Generic[L, K]):
     table_shape: TableShape
 
     def reshape(self, src: Table[str], dst: Table[str], default: K):
-        def new_layers():
-            for k, v in self.layers.items():
-                table = Table.Shape(self.table_shape, v, default).reshape(
-                    src, dst, default
-                )
-                yield k, table.values
+        return self.reshape_by(ReshapePlan.Compile(self.table_shape, src, dst), default)
 
-        return replace(self, layers=dict(new_layers()), table_shape=dst.shape)
+    def reshape_by(self, plan: "ReshapePlan", default: K):
+        return replace(
+            self,
+            layers={k: plan.apply(v, default) for k, v in self.layers.items()},
+            table_shape=dict(plan.table_shape),
+        )
 
     def map_keys(self, f: Callable[[K], K2]) -> "Keymap[L, K2]":
         new_layers = {
@@ -104,29 +107,138 @@ class Keymap(Generic[L, K]):
         )
 
 
+@dataclass(frozen=True)
+class ReshapePlan:
+    # source position per target cell, -1 picks the default
+    indices: tuple[int, ...]
+    table_shape: TableShape
+
+    def apply(self, keys: Sequence[K], default: K) -> list[K]:
+        padded = [*keys, default]
+        return [padded[i] for i in self.indices]
+
+    @classmethod
+    def Compile(cls, table_shape: TableShape, src: Table[str], dst: Table[str]):
+        position = {k: i for i, k in enumerate(table_shape)}
+        lbl_to_index = {v: position.get(k, -1) for k, v in src.indexed_cells.items()}
+        return cls(
+            tuple(lbl_to_index.get(dst[k], -1) for k in dst.shape),
+            dict(dst.shape),
+        )
+
+
+@cache
+def layout_table(text: str) -> Table[str]:
+    return Table.Parse(text)
+
+
+@lru_cache(maxsize=64)
+def _reshape_plan(
+    shape: tuple[tuple[tuple[int, int], tuple[int, int]], ...], src: str, dst: str
+):
+    return ReshapePlan.Compile(
+        dict(shape), layout_table(src), layout_table(dst).remove_cells(__not__)
+    )
+
+
+def reshape_plan(
+    table_shape: TableShape,
+    reshape: str,
+    layouts: Mapping[str, str] | None = None,
+):
+    layouts = {**ALT_LAYOUTS, **(layouts or {})}
+    return _reshape_plan(
+        tuple(table_shape.items()), layouts["source"], layouts[reshape]
+    )
+
+
+class OverlayLayer(Sequence[K]):
+    def __init__(self, base: Sequence[K], changes: Mapping[int, K]) -> None:
+        self.base = base
+        self.changes = changes
+
+    def __len__(self):
+        return len(self.base)
+
+    @overload
+    def __getitem__(self, index: int) -> K: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[K]: ...
+
+    def __getitem__(self, index: int | slice):
+        if isinstance(index, slice):
+            return self.materialize()[index]
+        if index < 0:
+            index += len(self.base)
+        return self.changes.get(index, self.base[index])
+
+    def __iter__(self):
+        if not self.changes:
+            return iter(self.base)
+        return iter(self.materialize())
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.base!r}, {self.changes!r})"
+
+    def materialize(self) -> list[K]:
+        keys = list(self.base)
+        for i, key in self.changes.items():
+            keys[i] = key
+        return keys
+
+
+def symbol_positions(keys: Sequence[Key]):
+    positions: dict[str, list[int]] = defaultdict(list)
+    for i, key in enumerate(keys):
+        if key.tap is not None:
+            positions[key.tap].append(i)
+        if key.hold is not None and key.hold != key.tap:
+            positions[key.hold].append(i)
+    return positions
+
+
+def layer_diagram(table_shape: TableShape, keys: Sequence[Key]) -> str:
+    return _layer_diagram(tuple(table_shape.items()), tuple(keys))
+
+
+@lru_cache(maxsize=256)
+def _layer_diagram(
+    shape: tuple[tuple[tuple[int, int], tuple[int, int]], ...], keys: tuple[Key, ...]
+):
+    table = Table.Shape(dict(shape), keys, Key.Empty())
+    return format_boxed_table(table.map_contents(lambda k: cjust(str(k).strip(), 5)))
+
+
 def make_multi_os_layers(
     layers: dict[str, list[Key]], os_specific_codes: dict[str, dict[str, str]]
 ):
+    from .matrix import KeymapMatrix
+
     first_layer_name = next(iter(layers))
+    os_refs = {"@" + os for os in os_specific_codes}
+    matrix = KeymapMatrix.From_layers(layers)
 
     def add_os_to_name(name: str, os: str):
         return join_layer_name(name, [os])
 
-    for name, keys in layers.items():
-        for os, os_spcecific in os_specific_codes.items():
+    def os_variant(os: str, os_spcecific: dict[str, str]):
+        def f(b: str) -> str:
+            if b in layers:
+                return LayerName(add_os_to_name(b, os))
 
-            def f(b: str) -> str:
-                if b in layers:
-                    return LayerName(add_os_to_name(b, os))
+            if b in os_refs:
+                return "@" + add_os_to_name(first_layer_name, b.removeprefix("@"))
 
-                if b.startswith("@"):
-                    target_os = b.removeprefix("@")
-                    if target_os in os_specific_codes:
-                        return "@" + add_os_to_name(first_layer_name, target_os)
+            return os_spcecific.get(b, b)
 
-                return os_spcecific.get(b, b)
+        # each distinct string is substituted once for all the layers
+        return matrix.map_strings(f)
 
-            yield (name, os), [key.map(f) for key in keys]
+    variants = {os: os_variant(os, codes) for os, codes in os_specific_codes.items()}
+    for i, (name, keys) in enumerate(layers.items()):
+        for os, variant in variants.items():
+            yield (name, os), OverlayLayer(keys, matrix.changes(variant, i))
 
 
 def join_layer_name(base_name: str, variations: Collection[str]):
@@ -150,57 +262,14 @@ def merge_layer_names(layer_names: Iterable[str]):
 
 
 def extract_tables_from_md(
-    f: Iterable[str], layout_section_re: str = r"layout definition"
+    f: MarkdownIndex | Iterable[str], layout_section_re: str = r"layout definition"
 ):
-    def md_header_depth(line: str):
-        line = line.strip()
-        return len(line) - len(line.lstrip("#"))
-
-    def md_find_section(predicate: Callable[[str], bool]):
-        lines = iter(f)
-        depth = 0
-        for line in lines:
-            if predicate(line):
-                depth = md_header_depth(line)
-                break
-
-        for line in lines:
-            d = md_header_depth(line)
-            if d and d <= depth:
-                break
-            else:
-                yield line
-
-    def match_head(line: str):
-        return re.match(r"^[#]+ +(.+)", line)
-
-    def match_table(line: str):
-        return re.match(r"^(\s*[|+].+)", line)
-
-    subsection = ""
-    in_table = False
-    table_lines: list[str] = []
-
-    def pred(s: str):
-        return bool(re.search(layout_section_re, s, flags=re.I))
-
-    for line in md_find_section(pred):
-        if m := match_head(line):
-            subsection = m.group(1).rstrip()
-        elif match_table(line):
-            in_table = True
-            table_lines.append(line.strip("\t\r\n"))
-        else:
-            if in_table:
-                yield str(subsection), Table.Parse(table_lines)
-                table_lines = []
-            in_table = False
-
-    if in_table:
-        yield str(subsection), Table.Parse(table_lines)
+    index = MarkdownIndex.Parse(f)
+    for subsection, block in index.section_tables(layout_section_re):
+        yield subsection, Table.Parse(index.block_lines(block))
 
 
-def extract_os_specifics_from_md(f: Iterable[str]):
+def extract_os_specifics_from_md(f: MarkdownIndex | Iterable[str]):
     for _, table in extract_tables_from_md(f, layout_section_re=r"OS specific"):
         for c in range(1, table.col_count):
             name = table[0, c]
@@ -214,67 +283,216 @@ def extract_os_specifics_from_md(f: Iterable[str]):
 
 
 def split_mods(kc: str) -> tuple[list[str], str]:
-    mods: list[str] = []
-    pattern = re.compile(MODIFIERS_RE + r"\+", re.I)
-    i = 0
-    while m := pattern.match(kc, i):
-        mods.append(m.group(1))
-        i = m.end()
-
-    return mods, kc[i:]
+    expr = parse_keycode(kc)
+    return list(expr.mods), expr.key
 
 
 ####
 
 
-def keymap_from_md(lines: Iterable[str], reshape: Optional[str] = None):
-    lines1, lines2 = tee(lines)
+def keymap_from_md(
+    lines: MarkdownIndex | Iterable[str],
+    reshape: str | None = None,
+    parser: Optional["KeymapParser"] = None,
+):
+    index = MarkdownIndex.Parse(lines)
 
-    keymap, titles = base_keymap_from_md(lines1)
-    if reshape:
-        src = Table.Parse(ALT_LAYOUTS["source"])
-        dst = Table.Parse(ALT_LAYOUTS[reshape]).remove_cells(__not__)
-        keymap = keymap.reshape(src, dst, Key.Empty())
+    keymap, titles = base_keymap_from_md(index, reshape=reshape, parser=parser)
 
-    os_specifics = dict(extract_os_specifics_from_md(lines2))
+    os_specifics = dict(extract_os_specifics_from_md(index))
     multi_os_layers = make_multi_os_layers(keymap.layers, os_specifics)
 
     return keymap, titles, multi_os_layers
 
 
-def base_keymap_from_md(lines: Iterable[str], reshape: Optional[str] = None):
-    def id_from_title(title: str, default: str):
-        if m := re.search(r"`([^`]+)`", title):
-            return str(m.group(1))
-        else:
-            return default
-
-    parsed = [
-        (id_from_title(title, f"layer#{i + 1}"), table, title)
-        for i, (title, table) in enumerate(extract_tables_from_md(lines))
-    ]
-    source_keymap = Keymap.From_tables({k: table for k, table, _ in parsed})
-    titles = {k: title for k, _, title in parsed}
+def base_keymap_from_md(
+    lines: MarkdownIndex | Iterable[str],
+    reshape: str | None = None,
+    parser: Optional["KeymapParser"] = None,
+):
+    keymap, titles = (parser or default_keymap_parser()).parse(lines)
+    return reshape_keymap(keymap, reshape), titles
 
-    keymap = add_holdtaps(source_keymap)
-    keymap = add_paths_from_titles(keymap, titles)
 
+def reshape_keymap(
+    keymap: Keymap[str, Key],
+    reshape: str | None = None,
+    layouts: Mapping[str, str] | None = None,
+):
     if reshape:
-        src = Table.Parse(ALT_LAYOUTS["source"])
-        dst = Table.Parse(ALT_LAYOUTS[reshape]).remove_cells(__not__)
-        keymap = keymap.reshape(src, dst, Key.Empty())
+        plan = reshape_plan(keymap.table_shape, reshape, layouts)
+        keymap = keymap.reshape_by(plan, Key.Empty())
+    return keymap
 
-    return keymap, titles
 
+def reshape_keymaps(
+    keymap: Keymap[str, Key],
+    reshapes: Iterable[str | None] | None = None,
+    layouts: Mapping[str, str] | None = None,
+) -> dict[str | None, Keymap[str, Key]]:
+    if reshapes is None:
+        reshapes = [k for k in {**ALT_LAYOUTS, **(layouts or {})} if k != "source"]
+    plans = {
+        reshape: reshape_plan(keymap.table_shape, reshape, layouts)
+        for reshape in dict.fromkeys(reshapes)
+        if reshape
+    }
 
-def add_holdtaps(
-    txt_keymap: Keymap[str, str],
-    holdtap_table_name: str = "hold-tap",
-    mods_on_all_layers: bool = False,
+    if not plans:
+        return {None: keymap}
+
+    from .matrix import KeymapMatrix
+
+    # intern the keys once and gather every layout from the id matrix
+    matrix = KeymapMatrix.From_keymap(keymap)
+    default = Key.Empty()
+    return {
+        None: keymap,
+        **{
+            reshape: matrix.reshape_by(plan, default).to_keymap()
+            for reshape, plan in plans.items()
+        },
+    }
+
+
+class KeymapParser:
+    def __init__(
+        self,
+        layout_section_re: str = r"layout definition",
+        holdtap_table_name: str = "hold-tap",
+        mods_on_all_layers: bool = False,
+    ) -> None:
+        self.layout_section_re = layout_section_re
+        self.holdtap_table_name = holdtap_table_name
+        self.mods_on_all_layers = mods_on_all_layers
+        self._tables: dict[bytes, Table[str]] = {}
+        self._layers: dict[Hashable, list[Key]] = {}
+
+    def parse(self, lines: MarkdownIndex | Iterable[str]):
+        index = MarkdownIndex.Parse(lines)
+
+        tables: dict[bytes, Table[str]] = {}
+        digests: dict[str, bytes] = {}
+        titles: dict[str, str] = {}
+        for i, (title, block) in enumerate(
+            index.section_tables(self.layout_section_re)
+        ):
+            digest = blake2b(index.block_bytes(block), digest_size=16).digest()
+            if digest not in tables:
+                if digest in self._tables:
+                    tables[digest] = self._tables[digest]
+                else:
+                    tables[digest] = Table.Parse(index.block_lines(block))
+            layer_id = id_from_title(title, f"layer#{i + 1}")
+            digests[layer_id] = digest
+            titles[layer_id] = title
+        self._tables = tables
+
+        txt_keymap = Keymap.From_tables(
+            {layer_id: tables[digest] for layer_id, digest in digests.items()}
+        )
+        shape_key = tuple(txt_keymap.table_shape.items())
+
+        taphold_digest = digests.pop(self.holdtap_table_name, None)
+        taphold = txt_keymap.layers.pop(self.holdtap_table_name, None)
+        layer_names = tuple(txt_keymap.layers)
+
+        holdtap_keys: dict[str, tuple[Hashable, list[Key]]] = {}
+        for i, (name, keys) in enumerate(txt_keymap.layers.items()):
+            is_first = i == 0
+            mods = is_first or self.mods_on_all_layers
+            cache_key = (
+                digests[name],
+                taphold_digest,
+                shape_key,
+                layer_names,
+                is_first,
+                mods,
+            )
+            if taphold is None:
+                holdtap_keys[name] = cache_key, cast(list[Key], keys)
+            elif cache_key in self._layers:
+                holdtap_keys[name] = cache_key, self._layers[cache_key]
+            else:
+                holdtap_keys[name] = (
+                    cache_key,
+                    make_tapholds(
+                        keys, taphold, layer_names, layers=is_first, mods=mods
+                    ),
+                )
+
+        overrides = paths_overrides(
+            {name: keys for name, (_, keys) in holdtap_keys.items()},
+            paths_from_titles(titles),
+        )
+
+        layers: dict[str, list[Key]] = {}
+        new_cache: dict[Hashable, list[Key]] = {}
+        for name, (cache_key, keys) in holdtap_keys.items():
+            new_cache[cache_key] = keys
+            layer_overrides = tuple(sorted(overrides.get(name, {}).items()))
+            if layer_overrides:
+                cache_key = cache_key, layer_overrides
+                if cache_key in self._layers:
+                    keys = self._layers[cache_key]
+                else:
+                    keys = override_holds(keys, dict(layer_overrides))
+                new_cache[cache_key] = keys
+            layers[name] = keys
+        self._layers = new_cache
+
+        return replace(txt_keymap, layers=layers), titles
+
+
+# one parser per process, so its table and layer caches carry over calls
+@cache
+def default_keymap_parser():
+    return KeymapParser()
+
+
+def replace_layer_tables(
+    lines: MarkdownIndex | Iterable[str],
+    tables: Mapping[str, str],
+    layout_section_re: str = r"layout definition",
+) -> bytes:
+    index = MarkdownIndex.Parse(lines)
+    blocks = {
+        id_from_title(title, f"layer#{i + 1}"): block
+        for i, (title, block) in enumerate(index.section_tables(layout_section_re))
+    }
+    if missing := set(tables) - set(blocks):
+        raise KeyError(f"unknown layers: {', '.join(sorted(missing))}")
+
+    data = index.data
+    parts: list[bytes] = []
+    offset = 0
+    for block, table in sorted(
+        ((blocks[k], v) for k, v in tables.items()), key=lambda x: x[0].offset
+    ):
+        parts.append(data[offset : block.offset])
+        parts.append(table.strip("\r\n").encode() + b"\n")
+        offset = block.end
+    parts.append(data[offset:])
+    return b"".join(parts)
+
+
+def id_from_title(title: str, default: str):
+    if m := re.search(r"`([^`]+)`", title):
+        return str(m.group(1))
+    else:
+        return default
+
+
+def make_tapholds(
+    keys: Iterable[str],
+    taphold: Iterable[str],
+    layer_names: Collection[str],
+    layers: bool = False,
+    mods: bool = True,
 ):
-    def make_taphold(tap: str, hold: str, layers: bool = False, mods: bool = True):
+    def make_taphold(tap: str, hold: str):
         if hold:
-            if hold in txt_keymap.layers:
+            if hold in layer_names:
                 if layers:
                     return Key(hold=LayerName(hold), tap=tap or None)
             elif re.match(MODIFIERS_RE, hold):
@@ -287,16 +505,30 @@ def add_holdtaps(
 
         return Key(tap=tap)
 
+    return list(map(make_taphold, keys, taphold))
+
+
+def add_holdtaps(
+    txt_keymap: Keymap[str, str],
+    holdtap_table_name: str = "hold-tap",
+    mods_on_all_layers: bool = False,
+):
     if holdtap_table_name in txt_keymap.layers:
         taphold = txt_keymap.layers.pop(holdtap_table_name)
 
         def new_layers():
             for i, (name, keys) in enumerate(txt_keymap.layers.items()):
                 is_first = i == 0
-                f = partial(
-                    make_taphold, layers=is_first, mods=is_first or mods_on_all_layers
+                yield (
+                    name,
+                    make_tapholds(
+                        keys,
+                        taphold,
+                        txt_keymap.layers,
+                        layers=is_first,
+                        mods=is_first or mods_on_all_layers,
+                    ),
                 )
-                yield name, list(map(f, keys, taphold))
 
         keymap = replace(txt_keymap, layers=dict(new_layers()))
     else:
@@ -305,7 +537,7 @@ def add_holdtaps(
     return cast(Keymap[str, Key], keymap)
 
 
-def add_paths_from_titles(keymap: Keymap[str, Key], titles: dict[str, str]):
+def paths_from_titles(titles: Mapping[str, str]):
     def parse_paths(title: str):
         for code in re.findall(r"`([^`]+)`", title):
             if m := re.match(r"([\w+]+)(?:([>,])|([+&]))([\w+]+)", code):
@@ -316,30 +548,49 @@ def add_paths_from_titles(keymap: Keymap[str, Key], titles: dict[str, str]):
             else:
                 yield [str(code)]
 
-    paths_by_id = {
-        layer_id: list(parse_paths(title)) for layer_id, title in titles.items()
-    }
-    return add_paths(keymap, paths_by_id)
+    return {layer_id: list(parse_paths(title)) for layer_id, title in titles.items()}
 
 
-def add_paths(
-    keymap: Keymap[str, Key], paths_by_id: Mapping[str, Sequence[Sequence[str]]]
+def add_paths_from_titles(keymap: Keymap[str, Key], titles: dict[str, str]):
+    return add_paths(keymap, paths_from_titles(titles))
+
+
+def paths_overrides(
+    layers: Mapping[str, Sequence[Key]],
+    paths_by_id: Mapping[str, Sequence[Sequence[str]]],
 ):
     layertaps = {
-        i: LayerName(x.hold)
-        for i, x in enumerate(keymap.layers["base"])
-        if x.hold in keymap.layers
+        i: LayerName(x.hold) for i, x in enumerate(layers["base"]) if x.hold in layers
     }
 
-    for layer_name, cells in keymap.layers.items():
+    overrides: dict[str, dict[int, LayerName]] = defaultdict(dict)
+    for layer_name in layers:
         for path in paths_by_id.get(layer_name, []):
             for src, dst in zip(path, path[1:]):
-                cells = keymap.layers[src]
                 for i, layer in layertaps.items():
                     if layer == dst:
-                        cells[i].hold = LayerName(layer_name)
+                        overrides[src][i] = LayerName(layer_name)
 
-    return keymap
+    return overrides
+
+
+def override_holds(keys: Sequence[Key], holds: Mapping[int, str]):
+    return [
+        replace(key, hold=holds[i]) if i in holds else key for i, key in enumerate(keys)
+    ]
+
+
+def add_paths(
+    keymap: Keymap[str, Key], paths_by_id: Mapping[str, Sequence[Sequence[str]]]
+):
+    overrides = paths_overrides(keymap.layers, paths_by_id)
+    return replace(
+        keymap,
+        layers={
+            name: override_holds(keys, overrides[name]) if name in overrides else keys
+            for name, keys in keymap.layers.items()
+        },
+    )
 
 
 ALT_LAYOUTS = {
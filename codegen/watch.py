@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+
+INOTIFY_EVENT = struct.Struct("iIII")
+
+logger = logging.getLogger(__name__)
+
+
+def watch_file(
+    filename: str | Path, debounce: float = 0.05, poll_interval: float = 0.2
+) -> Iterator[Path]:
+    path = Path(filename).absolute()
+    try:
+        yield from _watch_inotify(path, debounce)
+    except OSError:
+        yield from _watch_polling(path, poll_interval)
+
+
+def rebuild_on_change(filename: str | Path, build: Callable[[], object], done: str):
+    # a failed rebuild is reported and the next change is waited for
+    for _ in watch_file(filename):
+        t0 = time.perf_counter()
+        try:
+            build()
+        except Exception:
+            logger.exception("rebuild failed")
+        else:
+            dt = (time.perf_counter() - t0) * 1000
+            print(f"{done} in {dt:.0f}ms", file=sys.stderr)
+
+
+def _watch_inotify(path: Path, debounce: float) -> Iterator[Path]:
+    libc_name = ctypes.util.find_library("c")
+    if not libc_name:
+        raise OSError("libc not found")
+    libc = ctypes.CDLL(libc_name, use_errno=True)
+    if not hasattr(libc, "inotify_init1"):
+        raise OSError("inotify not available")
+
+    fd = libc.inotify_init1(os.O_CLOEXEC)
+    if fd < 0:
+        raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    try:
+        # watch the directory so editors replacing the file are noticed too
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(fd, bytes(path.parent), mask) < 0:
+            raise OSError(ctypes.get_errno(), f"cannot watch {path.parent}")
+
+        name = os.fsencode(path.name)
+        while True:
+            if _read_inotify_names(fd, None) & {name}:
+                while select.select([fd], [], [], debounce)[0]:
+                    _read_inotify_names(fd, 0)
+                yield path
+    finally:
+        os.close(fd)
+
+
+def _read_inotify_names(fd: int, timeout: float | None) -> set[bytes]:
+    if not select.select([fd], [], [], timeout)[0]:
+        return set()
+
+    buf = os.read(fd, 64 * 1024)
+    names: set[bytes] = set()
+    i = 0
+    while i < len(buf):
+        _wd, _mask, _cookie, length = INOTIFY_EVENT.unpack_from(buf, i)
+        i += INOTIFY_EVENT.size
+        names.add(buf[i : i + length].rstrip(b"\0"))
+        i += length
+    return names
+
+
+def _watch_polling(path: Path, interval: float) -> Iterator[Path]:
+    def signature():
+        try:
+            st = path.stat()
+            return st.st_mtime_ns, st.st_size
+        except FileNotFoundError:
+            return None
+
+    last = signature()
+    while True:
+        time.sleep(interval)
+        current = signature()
+        if current != last and current is not None:
+            last = current
+            yield path
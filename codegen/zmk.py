@@ -1,34 +1,49 @@
 from __future__ import annotations
 
 import re
-from collections import defaultdict
 from dataclasses import dataclass, replace
+from functools import cache, lru_cache
+from io import StringIO
 from itertools import chain, groupby
 from typing import (
+    Any,
     Callable,
     Generic,
+    Hashable,
     Iterable,
     Iterator,
     Literal,
     Mapping,
-    Optional,
     Self,
     Sequence,
+    TextIO,
     TypeVar,
 )
-
-from .asciitables import Table, TableShape, cjust, format_boxed_table, format_table
-from .dt import Comment, Node, Raw, format_value
+from weakref import WeakKeyDictionary
+
+from .asciitables import AlignmentPlan
+from .dt import (
+    AnyNode,
+    Comment,
+    FrozenNode,
+    Node,
+    Raw,
+    format_value,
+    node_key,
+    write_dtnode,
+)
+from .flyweight import Interned
+from .keycode_db import keycode_database
+from .keycodes import parse_keycode, parse_keycode_call
 from .source import (
     Key,
     Keymap,
     LayerName,
     join_layer_name,
+    layer_diagram,
     merge_layer_names,
     split_layer_name,
-    split_mods,
 )
-from .zmk_keycodes import ZMK_KEYCODES, ZMK_KEYCODES_ALIASES
 
 BINDINGS_INCLUDES = {
     "kp": ["<dt-bindings/zmk/keys.h>"],
@@ -39,10 +54,76 @@ BINDINGS_INCLUDES = {
 }
 
 
+@dataclass
+class ZmkKeymapModel:
+    layers: list[Layer]
+    layer_oses: dict[str, list[str]]
+    bindings: list[Binding]
+    behaviors: list[AnyNode | Comment | Raw]
+    includes: set[str]
+
+    @classmethod
+    def Build(
+        cls,
+        multi_os_layers: Iterable[tuple[tuple[str, str], Sequence[Key]]],
+        aliases_for_os: Callable[
+            [str], dict[str, str | Binding | Callable[[re.Match[str]], str | Binding]]
+        ]
+        | None = None,
+    ):
+        binding_layers = Layer.Deduplicate(
+            [
+                Layer(
+                    join_layer_name(source_layer, [os]),
+                    list(map(BindingTranslator.For_os(aliases_for_os, os), keys)),
+                    source_layer,
+                    display_name=os if source_layer == "base" else source_layer,
+                )
+                for (source_layer, os), keys in multi_os_layers
+            ]
+        )
+
+        layers = [
+            layer.rename_layers_in_bindings(layer.Shorten_name)
+            for layer in binding_layers
+        ]
+        layer_oses = {
+            short.name: split_layer_name(layer.name)[1]
+            for short, layer in zip(layers, binding_layers)
+        }
+
+        bindings = list(
+            dict.fromkeys(binding for layer in layers for binding in layer.bindings)
+        )
+        behaviors = {
+            node_key(x): x
+            for x in chain.from_iterable(
+                binding.behavior_nodes or () for binding in bindings
+            )
+        }
+        includes = {"<behaviors.dtsi>"}.union(
+            *(binding_includes(binding) for binding in bindings)
+        )
+
+        return cls(layers, layer_oses, bindings, list(behaviors.values()), includes)
+
+
 def generate_zmk_keymap_code(
     keymap: Keymap[str, Key],
     titles: Mapping[str, str],
-    multi_os_layers: Iterable[tuple[tuple[str, str], list[Key]]],
+    multi_os_layers: Iterable[tuple[tuple[str, str], Sequence[Key]]],
+    **kwargs: Any,
+) -> Iterator[str]:
+    sink = StringIO()
+    write_zmk_keymap_code(sink, keymap, titles, multi_os_layers, **kwargs)
+    return iter(sink.getvalue().removesuffix("\n").split("\n"))
+
+
+def write_zmk_keymap_code(
+    sink: TextIO,
+    keymap: Keymap[str, Key],
+    titles: Mapping[str, str],
+    multi_os_layers: Iterable[tuple[tuple[str, str], Sequence[Key]]],
     *,
     transform_name: str = "default_transform",
     aliases_for_os: Callable[
@@ -50,53 +131,29 @@ def generate_zmk_keymap_code(
     ]
     | None = None,
     extra_includes: Iterable[str] = (),
-) -> Iterator[str]:
-    binding_layers = [
-        Layer(
-            join_layer_name(source_layer, [os]),
-            list(
-                map(
-                    BindingTranslator(
-                        aliases_for_os(os) if callable(aliases_for_os) else {}
-                    ),
-                    keys,
-                )
-            ),
-            source_layer,
-            display_name=os if source_layer == "base" else source_layer,
-        )
-        for (source_layer, os), keys in multi_os_layers
-    ]
-
-    binding_layers = [
-        layer.rename_layers_in_bindings(layer.Shorten_name)
-        for layer in Layer.Deduplicate(binding_layers)
-    ]
+):
+    model = ZmkKeymapModel.Build(multi_os_layers, aliases_for_os)
+    binding_layers = model.layers
 
     defines = [(layer.name, i) for i, layer in enumerate(binding_layers)]
 
+    alignment = AlignmentPlan.Compile(
+        keymap.table_shape,
+        [layer.binding_cells() for layer in binding_layers],
+        sep="",
+        pad=" ",
+    )
+
     def keymap_contents():
         for source_layer, layers in groupby(
             binding_layers, lambda layer: layer.source_layer
         ):
-            source_table = Table.Shape(
-                keymap.table_shape, keymap.layers[source_layer], Key.Empty()
-            )
-            formatted_table = format_boxed_table(
-                source_table.map_contents(lambda s: cjust(str(s).strip(), 5))
+            formatted_table = layer_diagram(
+                keymap.table_shape, keymap.layers[source_layer]
             )
             yield Comment(f"{titles[source_layer]}\n{formatted_table}")
             for layer in layers:
-                yield layer.formatted_bindings(keymap.table_shape)
-
-    behaviors = {
-        repr(x): x
-        for x in chain.from_iterable(
-            binding.behavior_nodes or []
-            for layer in binding_layers
-            for binding in layer.bindings
-        )
-    }.values()
+                yield layer.formatted_bindings(alignment)
 
     nodes = [
         Node(
@@ -115,7 +172,7 @@ def generate_zmk_keymap_code(
                 ),
                 Node(
                     "behaviors",
-                    children=list(behaviors),
+                    children=list(model.behaviors),
                 ),
             ],
         ),
@@ -137,26 +194,17 @@ def generate_zmk_keymap_code(
         ),
     ]
 
-    def find_includes():
-        yield "<behaviors.dtsi>"
-        for layer in binding_layers:
-            for binding in layer.bindings:
-                for b in binding.find_all_behaviors():
-                    for v in BINDINGS_INCLUDES.get(b, []):
-                        yield v
-
-    for include in chain(sorted(set(find_includes())), extra_includes):
+    for include in chain(sorted(model.includes), extra_includes):
         if not include.startswith("<") or include.startswith('"'):
             include = f'"{include}"'
-        yield f"#include {include}"
-    yield ""
+        sink.write(f"#include {include}\n")
+    sink.write("\n")
 
-    for name, value in defines:
-        yield f"#define {name} {value}"
+    sink.writelines(f"#define {name} {value}\n" for name, value in defines)
 
     for node in nodes:
-        yield ""
-        yield node.format_dt()
+        sink.write("\n")
+        write_dtnode(node, sink)
 
 
 T = TypeVar("T")
@@ -190,32 +238,81 @@ class LayerBase(Generic[T]):
     def Deduplicate(
         cls, binding_layers: Sequence[Self], exceptions: Iterable[str] = ()
     ) -> Sequence[Self]:
+        index_by_name = {layer.name: i for i, layer in enumerate(binding_layers)}
         exceptions_set = set(exceptions)
-        for _ in range(len(binding_layers)):
-            by_repr: dict[tuple[str, str], list[Self]] = defaultdict(list)
-            for i, layer in enumerate(binding_layers):
-                by_repr[
-                    layer.source_layer,
-                    str(i)
-                    if layer.source_layer in exceptions_set
-                    else repr(layer.bindings),
-                ].append(layer)
-            grouped = [vs for vs in by_repr.values()]
-
-            new_names = {
-                layer.name: merge_layer_names(layer.name for layer in layers)
-                for layers in grouped
-                for layer in layers
-                if len(layers) > 1
-            }
-            if not new_names:
-                break
 
-            binding_layers = [
-                layers[0].rename_layers_in_bindings(lambda k: new_names.get(k, k))
-                for layers in grouped
-            ]
-        return binding_layers
+        # split every layer into its bindings with the layer references abstracted
+        # away and the layers it references
+        refs: list[list[int]] = []
+        kinds: dict[Hashable, int] = {}
+        kind: list[int] = []
+        for i, layer in enumerate(binding_layers):
+            layer_refs: list[int] = []
+
+            def collect(name: str, layer_refs: list[int] = layer_refs):
+                if name in index_by_name:
+                    layer_refs.append(index_by_name[name])
+                    return ""
+                return name
+
+            abstract = tuple(
+                cls.Rename_layer_in_binding(binding, collect)
+                for binding in layer.bindings
+            )
+            refs.append(layer_refs)
+            kind.append(
+                kinds.setdefault(
+                    (
+                        layer.source_layer,
+                        i if layer.source_layer in exceptions_set else abstract,
+                    ),
+                    len(kinds),
+                )
+            )
+
+        referenced_by: list[set[int]] = [set() for _ in binding_layers]
+        for i, layer_refs in enumerate(refs):
+            for j in layer_refs:
+                referenced_by[j].add(i)
+
+        # merge layers whose bindings agree once the layers they reference are
+        # merged, revisiting only the layers that reference a merged one
+        parent = list(range(len(binding_layers)))
+        members = [[i] for i in range(len(binding_layers))]
+
+        def find(i: int):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        by_signature: dict[Hashable, int] = {}
+        pending = list(reversed(range(len(binding_layers))))
+        while pending:
+            i = pending.pop()
+            signature = kind[i], tuple(find(j) for j in refs[i])
+            root, other = sorted((find(i), find(by_signature.setdefault(signature, i))))
+            if root == other:
+                continue
+
+            parent[other] = root
+            for j in members[other]:
+                pending.extend(referenced_by[j])
+            members[root] += members[other]
+            members[other] = []
+
+        new_names = {
+            binding_layers[j].name: merge_layer_names(
+                binding_layers[k].name for k in sorted(group)
+            )
+            for group in members
+            for j in group
+        }
+        return [
+            layer.rename_layers_in_bindings(lambda k: new_names.get(k, k))
+            for i, layer in enumerate(binding_layers)
+            if members[i]
+        ]
 
     @classmethod
     def Shorten_name(cls, layer_name: str):
@@ -224,54 +321,89 @@ class LayerBase(Generic[T]):
         return re.sub(r"[^a-z0-9]", "_", short_name, flags=re.I)
 
 
-class BindingTranslator:
+def compile_alternation(patterns: Sequence[re.Pattern[str]]):
+    # one regex trying all the patterns in order, the named group tells which one
+    # matched; patterns that cannot be combined are left to a linear scan
+    if not patterns or any(
+        p.groupindex or p.flags & ~re.UNICODE or re.search(r"\\\d|\(\?P=", p.pattern)
+        for p in patterns
+    ):
+        return None
+    try:
+        return re.compile(
+            "|".join(f"(?P<alias{i}>{p.pattern})" for i, p in enumerate(patterns))
+        )
+    except re.error:
+        return None
+
+
+class BindingTranslatorBase(Generic[T]):
     def __init__(
         self,
-        aliases: Mapping[str, str | Binding | Callable[[re.Match[str]], str | Binding]],
+        aliases: Mapping[str, str | T | Callable[[re.Match[str]], str | T]],
     ) -> None:
-        self.aliases: dict[str, str | Binding] = {}
+        self.aliases: dict[str, str | T] = {}
         self.callable_aliases: dict[
-            re.Pattern[str], Callable[[re.Match[str]], str | Binding]
+            re.Pattern[str], Callable[[re.Match[str]], str | T]
         ] = {}
         for k, v in aliases.items():
             if callable(v):
                 self.callable_aliases[re.compile(k)] = v
             else:
                 self.aliases[k] = v
+        self.alias_patterns = list(self.callable_aliases)
+        self.alias_dispatch = compile_alternation(self.alias_patterns)
+        self.translated: WeakKeyDictionary[Key, T] = WeakKeyDictionary()
 
-    def __call__(self, key: Key):
+    @classmethod
+    @lru_cache(maxsize=32)
+    def For_os(
+        cls,
+        aliases_for_os: Callable[
+            [str], Mapping[str, str | T | Callable[[re.Match[str]], str | T]]
+        ]
+        | None,
+        os: str,
+    ) -> Self:
+        return cls(aliases_for_os(os) if callable(aliases_for_os) else {})
+
+    def __call__(self, key: Key) -> T:
         try:
-            if isinstance(key.hold, LayerName):
-                if key.tap:
-                    return lt_binding(key.hold, self.translate_binding(key.tap))
-                else:
-                    return mo_binding(key.hold)
-            elif key.hold and key.tap:
-                return home_row_mod_binding(
-                    lookup_keycode(key.hold), self.translate_binding(key.tap)
-                )
-            elif key.tap:
-                return self.translate_binding(key.tap)
-            else:
-                return Binding("none")
+            return self.translated[key]
         except KeyError:
-            print("unimplemented: ", repr(key))
-            return Binding("none")
+            binding = self.translated[key] = self.translate_key(key)
+            return binding
 
-    def follow_aliases(self, txt: str):
+    def translate_key(self, key: Key) -> T: ...
+
+    def match_callable_alias(self, txt: str):
+        if self.alias_dispatch:
+            if not (m := self.alias_dispatch.match(txt)) or not m.lastgroup:
+                return None
+            pattern = self.alias_patterns[int(m.lastgroup.removeprefix("alias"))]
+            if m := pattern.match(txt):
+                return pattern, m
+
+        for pattern in self.alias_patterns:
+            if m := pattern.match(txt):
+                return pattern, m
+        return None
+
+    def is_binding(self, found: object) -> bool: ...
+
+    def follow_aliases(self, txt: str) -> str | T:
         seen: set[str] = set()
         while txt not in seen:
             try:
                 found = self.aliases[txt]
             except KeyError:
-                for k, v in self.callable_aliases.items():
-                    if m := k.match(txt):
-                        found = v(m)
-                        break
+                if matched := self.match_callable_alias(txt):
+                    pattern, m = matched
+                    found = self.callable_aliases[pattern](m)
                 else:
                     break
 
-            if isinstance(found, Binding):
+            if self.is_binding(found):
                 return found
             else:
                 seen.add(found)
@@ -279,26 +411,44 @@ class BindingTranslator:
                 break
         return txt
 
+
+class BindingTranslator(BindingTranslatorBase["Binding"]):
+    def is_binding(self, found: object):
+        return isinstance(found, Binding)
+
+    def translate_key(self, key: Key):
+        try:
+            if isinstance(key.hold, LayerName):
+                if key.tap:
+                    return lt_binding(key.hold, self.translate_binding(key.tap))
+                else:
+                    return mo_binding(key.hold)
+            elif key.hold and key.tap:
+                return home_row_mod_binding(
+                    lookup_keycode(key.hold), self.translate_binding(key.tap)
+                )
+            elif key.tap:
+                return self.translate_binding(key.tap)
+            else:
+                return Binding("none")
+        except KeyError:
+            print("unimplemented: ", repr(key))
+            return Binding("none")
+
     def translate_binding(self, txt: str):
         found = self.follow_aliases(txt)
         if isinstance(found, Binding):
             return found
         else:
-            txt_mods, text_key = split_mods(found)
-            kc_key = lookup_keycode(text_key)
-            kc_mods = [ZMK_MODIFIERS[lookup_keycode(mod)] for mod in txt_mods]
-            kp = "(".join(map(str, (*kc_mods, kc_key))) + ")" * len(kc_mods)
-            return kp_binding(kp)
+            modifiers = zmk_modifiers()
+            expr = parse_keycode(found).map(
+                lookup_keycode, lambda mod: modifiers[lookup_keycode(mod)]
+            )
+            return kp_binding(expr.format_call())
 
 
 def lookup_keycode(name: str):
-    if name.upper() in ZMK_KEYCODES:
-        return name.upper()
-    else:
-        try:
-            return ZMK_KEYCODES_ALIASES[name]
-        except KeyError:
-            return ZMK_KEYCODES_ALIASES[name.upper()]
+    return keycode_database().zmk(name)
 
 
 def kp_binding(keycode: str):
@@ -323,7 +473,7 @@ def shiftmorph_binding(regular: str, shifted: str) -> Binding:
     return Binding(
         name,
         behavior_nodes=(
-            Node(
+            FrozenNode(
                 name,
                 label=name,
                 properties={
@@ -338,7 +488,7 @@ def shiftmorph_binding(regular: str, shifted: str) -> Binding:
 
 
 def bootloader_binding() -> Binding:
-    tapdance_node = Node(
+    tapdance_node = FrozenNode(
         "bootl",
         label="bootl",
         properties={
@@ -351,7 +501,7 @@ def bootloader_binding() -> Binding:
     return Binding("bootl", behavior_nodes=(tapdance_node,))
 
 
-BTSEL_NODE = Node(
+BTSEL_NODE = FrozenNode(
     "btsel",
     label="btsel",
     properties={
@@ -369,7 +519,7 @@ def bt_binding(i: int):
     bt_disc_binding = Binding("bt", "BT_DISC", str(i - 1))
     bt_clr_binding = Binding("bt", "BT_CLR")
 
-    bt_node = Node(
+    bt_node = FrozenNode(
         f"bt{i}",
         label=f"bt{i}",
         properties={
@@ -392,10 +542,10 @@ def bt_binding(i: int):
 def macro_node(
     identifier: str,
     *behaviors: Sequence[Binding],
-    tap_ms: Optional[int] = None,
-    wait_ms: Optional[int] = None,
-) -> Node:
-    return Node(
+    tap_ms: int | None = None,
+    wait_ms: int | None = None,
+) -> FrozenNode:
+    return FrozenNode(
         identifier,
         label=identifier,
         properties={
@@ -411,8 +561,8 @@ def macro_node(
 def macro_binding(
     identifier: str,
     *behaviors: Sequence[Binding],
-    tap_ms: Optional[int] = None,
-    wait_ms: Optional[int] = None,
+    tap_ms: int | None = None,
+    wait_ms: int | None = None,
 ) -> Binding:
     return Binding(
         identifier,
@@ -422,40 +572,43 @@ def macro_binding(
     )
 
 
-MACRO_MACRO = Raw(r"""
-#define _F(x) x
-#define _KP(x) x
-#define _BINDING_CELLS _F(#)binding-cells
-#define UTF8_MACROS(name, C1, C2, C3, C4) \
-    name##_L: name##_L { \
-        compatible = "zmk,behavior-macro"; \
-        _BINDING_CELLS = <0>; \
-        bindings = <&macro_tap &kp LC(LS(U)) &kp C1 &kp C1 &kp C3 &kp C4 &kp SPACE>; \
-        tap-ms = <30>; \
-        wait-ms = <0>; \
-    }; \
-    name##_M: name##_M { \
-        compatible = "zmk,behavior-macro"; \
-        _BINDING_CELLS = <0>; \
-        bindings = <&macro_press &kp LALT>, <&macro_tap &kp C1 &kp C1 &kp C3 &kp C4>, <&macro_release &kp LALT>; \
-        tap-ms = <30>; \
-        wait-ms = <30>; \
-    }; \
-    name##_W: name##_W { \
-        compatible = "zmk,behavior-macro"; \
-        _BINDING_CELLS = <0>; \
-        bindings = <&macro_tap &kp RALT &kp U &kp C1 &kp C1 &kp C3 &kp C4 &kp RET> ; \
-    };
-""")
+def utf8_macro_node(char: str, os: Literal["L", "M", "W"]) -> FrozenNode:
+    hexstr = "%04x" % ord(char)
+    digits = [Binding("kp", d.upper() if d in "abcdef" else f"N{d}") for d in hexstr]
+    tap, press, release = (
+        Binding("macro_tap"),
+        Binding("macro_press"),
+        Binding("macro_release"),
+    )
+    if os == "L":
+        behaviors = [[tap, Binding("kp", "LC(LS(U))"), *digits, Binding("kp", "SPACE")]]
+        tap_ms, wait_ms = 30, 0
+    elif os == "M":
+        behaviors = [
+            [press, Binding("kp", "LALT")],
+            [tap, *digits],
+            [release, Binding("kp", "LALT")],
+        ]
+        tap_ms, wait_ms = 30, 30
+    else:
+        behaviors = [
+            [
+                tap,
+                Binding("kp", "RALT"),
+                Binding("kp", "U"),
+                *digits,
+                Binding("kp", "RET"),
+            ]
+        ]
+        tap_ms, wait_ms = None, None
+
+    node = macro_node(f"u{hexstr}_{os}", *behaviors, tap_ms=tap_ms, wait_ms=wait_ms)
+    return replace(node, comment=char)
 
 
 def utf8_macro_binding(char: str, os: Literal["L", "M", "W"]) -> Binding:
-    hexstr = "%04x" % ord(char)
-    keycodes = [d.upper() if d in "abcdef" else f"N{d}" for d in hexstr]
-    params = ", ".join([f"u{hexstr} /* {char} */", *keycodes])
-    return Binding(
-        f"u{hexstr}_{os}", behavior_nodes=(MACRO_MACRO, Raw(f"UTF8_MACROS({params})"))
-    )
+    node = utf8_macro_node(char, os)
+    return Binding(node.name, behavior_nodes=(node,))
 
 
 def utf8_linux_macro_binding(char: str):
@@ -470,7 +623,7 @@ def utf8_win_macro_binding(char: str) -> Binding:
     return utf8_macro_binding(char, "W")
 
 
-HRM_NODE = Node(
+HRM_NODE = FrozenNode(
     "modtap",
     label="hrm",
     properties={
@@ -489,13 +642,13 @@ def home_row_mod_binding(mod_keycode: str, tap_keycode_binding: Binding):
     )
 
 
-@dataclass(frozen=True)
-class Binding:
+@dataclass(frozen=True, slots=True, eq=False)
+class Binding(Interned):
     behavior: str
-    param1: Optional[str] = None
-    param2: Optional[str] = None
+    param1: str | None = None
+    param2: str | None = None
     includes: tuple[str, ...] = ()
-    behavior_nodes: tuple[Node | Comment | Raw, ...] = ()
+    behavior_nodes: tuple[AnyNode | Comment | Raw, ...] = ()
 
     def format_dt(self):
         return " ".join(
@@ -508,18 +661,42 @@ class Binding:
     def find_all_behaviors(self) -> Iterator[str]:
         yield self.behavior
 
-        def f(node: Node) -> Iterator[str]:
+        def f(node: AnyNode) -> Iterator[str]:
             yield node.name
             for child in node.children:
-                if isinstance(child, Node):
+                if isinstance(child, (Node, FrozenNode)):
                     yield from f(child)
             yield from re.findall(r"\W&(\w+)\W", node.format_dt())
 
         for node in self.behavior_nodes:
-            if isinstance(node, Node):
+            if isinstance(node, (Node, FrozenNode)):
                 yield from f(node)
 
 
+_BINDING_BEHAVIORS: WeakKeyDictionary[Binding, frozenset[str]] = WeakKeyDictionary()
+_BINDING_INCLUDES: WeakKeyDictionary[Binding, frozenset[str]] = WeakKeyDictionary()
+
+
+def binding_behaviors(binding: Binding) -> frozenset[str]:
+    try:
+        return _BINDING_BEHAVIORS[binding]
+    except KeyError:
+        behaviors = _BINDING_BEHAVIORS[binding] = frozenset(
+            binding.find_all_behaviors()
+        )
+        return behaviors
+
+
+def binding_includes(binding: Binding) -> frozenset[str]:
+    try:
+        return _BINDING_INCLUDES[binding]
+    except KeyError:
+        includes = _BINDING_INCLUDES[binding] = frozenset(
+            v for b in binding_behaviors(binding) for v in BINDINGS_INCLUDES.get(b, [])
+        )
+        return includes
+
+
 @dataclass
 class Layer(LayerBase[Binding]):
     display_name: str
@@ -535,15 +712,14 @@ class Layer(LayerBase[Binding]):
         else:
             return binding
 
-    def formatted_bindings(self, table_shape: TableShape):
-        formatted_bindings = [str(b.format_dt()) for b in self.bindings]
-        formated = format_table(
-            Table.Shape(table_shape, formatted_bindings, ""),
-            sep="",
-            pad=" ",
-            just=str.ljust,
+    def binding_cells(self):
+        return [str(b.format_dt()) for b in self.bindings]
+
+    def formatted_bindings(self, alignment: AlignmentPlan):
+        formated = "\n".join(
+            line.rstrip()
+            for line in alignment.format_lines(self.binding_cells(), str.ljust)
         )
-        formated = "\n".join(layer.rstrip() for layer in formated.splitlines())
         return Node(
             self.name,
             properties={
@@ -564,26 +740,23 @@ class NestedBindings(list[Bindings]):
         return ", ".join(map(format_value, self))
 
 
-ZMK_MODIFIERS = {
-    lookup_keycode(k): v
-    for k, v in dict(
-        LSHFT="LS",
-        LCTRL="LC",
-        LALT="LA",
-        LGUI="LG",
-        RSHFT="RS",
-        RCTRL="RC",
-        RALT="RA",
-        RGUI="RG",
-    ).items()
-}
-ZMK_MODIFIERS_RE = re.compile(
-    r"^\s*(" + r"|".join(ZMK_MODIFIERS.values()) + r")\s*\(\s*(.+)\s*\)\s*$"
+ZMK_MODIFIER_NAMES = dict(
+    LSHFT="LS",
+    LCTRL="LC",
+    LALT="LA",
+    LGUI="LG",
+    RSHFT="RS",
+    RCTRL="RC",
+    RALT="RA",
+    RGUI="RG",
 )
+ZMK_MODIFIER_FUNCTIONS = tuple(ZMK_MODIFIER_NAMES.values())
+
+
+@cache
+def zmk_modifiers():
+    return {lookup_keycode(k): v for k, v in ZMK_MODIFIER_NAMES.items()}
 
 
 def split_zmk_keycode_mods(zmk_keycode: str) -> list[str]:
-    if m := ZMK_MODIFIERS_RE.match(zmk_keycode):
-        return [m.group(1), *split_zmk_keycode_mods(m.group(2))]
-    else:
-        return [zmk_keycode]
+    return list(parse_keycode_call(zmk_keycode, ZMK_MODIFIER_FUNCTIONS))
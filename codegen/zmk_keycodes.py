@@ -201,23 +201,39 @@ ZMK_KEYCODES_ALIASES = {
 }
 
 if __name__ == "__main__":
-    parser = ArgumentParser()
-    parser.add_argument("zmk_dir")
+    parser = ArgumentParser(
+        description="update the ZMK keycodes and the compiled keycode database"
+    )
+    parser.add_argument("zmk_dir", nargs="?", help="ZMK source checkout")
+    parser.add_argument(
+        "--write",
+        action="store_true",
+        help="update this file in place instead of printing it",
+    )
     args = parser.parse_args()
 
-    keys_h_path = Path(args.zmk_dir) / "app/include/dt-bindings/zmk/keys.h"
+    source = Path(__file__).read_text()
+    if args.zmk_dir:
+        keys_h_path = Path(args.zmk_dir) / "app/include/dt-bindings/zmk/keys.h"
 
-    keycodes: set[str] = set()
-    for line in open(keys_h_path):
-        if m := re.match(r"\s*#define\s+(\w+)\s*(.+)", line):
-            if "deprecated" not in line.lower():
-                keycodes.add(m.group(1))
+        keycodes: set[str] = set()
+        for line in open(keys_h_path):
+            if m := re.match(r"\s*#define\s+(\w+)\s*(.+)", line):
+                if "deprecated" not in line.lower():
+                    keycodes.add(m.group(1))
 
-    print(
-        re.sub(
+        source = re.sub(
             r"(ZMK_KEYCODES = ){[^)]+}",
             rf"\1{pformat(keycodes, compact=True)}",
-            Path(__file__).read_text(),
+            source,
             flags=re.DOTALL,
         )
-    )
+
+    if not args.write:
+        print(source)
+    else:
+        Path(__file__).write_text(source)
+
+        from codegen.keycode_db import KeycodeDatabase
+
+        KeycodeDatabase.Load()
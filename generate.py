@@ -1,21 +1,60 @@
+from __future__ import annotations
+
 import re
 import sys
+import tomllib
 from argparse import ArgumentParser, Namespace
-from typing import Callable, Iterable, TextIO, TypeVar
+from functools import cache as cache_result
+from io import StringIO
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Iterable,
+    Mapping,
+    Sequence,
+    TextIO,
+    TypeVar,
+)
 
-from codegen.qmk import CustomShift, QmkBinding, QmkKey, generate_qmk_layout_code
-from codegen.source import ALT_LAYOUTS, keymap_from_md
+from codegen.cache import (
+    ArtifactCache,
+    NoCache,
+    bytes_digest,
+    default_cache_dir,
+    generator_version,
+    replace_if_changed,
+    write_if_changed,
+)
+from codegen.keycode_db import configure_keycode_database
+from codegen.markdown import MarkdownIndex
+from codegen.source import (
+    ALT_LAYOUTS,
+    Key,
+    Keymap,
+    KeymapParser,
+    default_keymap_parser,
+    extract_os_specifics_from_md,
+    make_multi_os_layers,
+    reshape_keymap,
+    reshape_keymaps,
+)
 from codegen.zmk import (
     Binding,
+    ZmkKeymapModel,
     bootloader_binding,
     bt_binding,
-    generate_zmk_keymap_code,
     shiftmorph_binding,
     utf8_linux_macro_binding,
     utf8_mac_macro_binding,
     utf8_win_macro_binding,
+    write_zmk_keymap_code,
 )
 
+if TYPE_CHECKING:
+    from codegen.qmk import QmkBinding
+
 
 def argument_parser():
     parser = ArgumentParser(
@@ -23,15 +62,35 @@ def argument_parser():
     )
     subparsers = parser.add_subparsers(dest="command", required=True)
 
-    parser.add_argument("readme", metavar="README.MD", help="readme markdown filename")
-    parser.add_argument("output", metavar="OUTPUT", help="output keymap filename")
+    io = ArgumentParser(add_help=False)
+    io.add_argument("readme", metavar="README.MD", help="readme markdown filename")
+    io.add_argument("output", metavar="OUTPUT", help="output keymap filename")
+
+    parser.add_argument(
+        "--cache-dir", metavar="DIR", help="generated artifacts cache directory"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="always regenerate the outputs",
+    )
+    parser.add_argument(
+        "--clear-cache",
+        action="store_true",
+        help="drop the cached artifacts before generating",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="regenerate the outputs whenever the readme changes",
+    )
     parser.add_argument(
         "--reshape",
         dest="reshape",
         help="alternative layout to reshape to",
         choices=ALT_LAYOUTS.keys(),
     )
-    zmk = subparsers.add_parser("ZMK", help="create a ZMK keymap")
+    zmk = subparsers.add_parser("ZMK", help="create a ZMK keymap", parents=[io])
     zmk.add_argument(
         "--transform",
         default="default_transform",
@@ -39,53 +98,282 @@ def argument_parser():
         help="matrix transform name",
     )
 
-    qmk = subparsers.add_parser("QMK", help="create a QMK layout")
+    qmk = subparsers.add_parser("QMK", help="create a QMK layout", parents=[io])
     qmk.add_argument(
         "--layout", default="LAYOUT", metavar="NAME", help="layout macro name"
     )
 
+    batch = subparsers.add_parser(
+        "batch", help="create all the targets listed in a manifest"
+    )
+    batch.add_argument("manifest", metavar="TARGETS.TOML", help="manifest filename")
+
+    analyze = subparsers.add_parser(
+        "analyze", help="estimate the firmware footprint of the generated keymaps"
+    )
+    analyze.add_argument("readme", metavar="README.MD", help="readme markdown filename")
+    analyze.add_argument(
+        "--firmware",
+        action="append",
+        choices=("ZMK", "QMK"),
+        help="firmware to analyze, all of them by default",
+    )
+
+    serve = subparsers.add_parser(
+        "serve", help="serve keymap generation requests over local HTTP"
+    )
+    serve.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    serve.add_argument("--port", type=int, default=8765, help="port to listen on")
+
     return parser
 
 
 T = TypeVar("T")
 
+TARGET_OPTIONS = ("command", "reshape", "transform", "layout", "layers", "columns")
+
 
 def main(args: Namespace):
-    keymap, titles, multi_os_layers = keymap_from_md(
-        open(args.readme), reshape=args.reshape
+    configure_keycode_database(args.cache_dir, not args.no_cache)
+
+    if args.command == "serve":
+        from codegen.service import KeymapService, make_server
+
+        with make_server(
+            KeymapService(generate_target), args.host, args.port
+        ) as server:
+            server.serve_forever()
+        return
+
+    if args.command == "analyze":
+        from codegen.footprint import format_analyses
+
+        analyses = analyze_targets(
+            Path(args.readme),
+            args.firmware or ["ZMK", "QMK"],
+            analyzed_reshapes(args.reshape),
+        )
+        print(format_analyses(analyses))
+        return
+
+    cache = (
+        NoCache()
+        if args.no_cache
+        else ArtifactCache(
+            args.cache_dir or default_cache_dir(),
+            generator_version([__file__, Path(__file__).with_name("render_svg.py")]),
+        )
+    )
+    if args.clear_cache:
+        cache.clear()
+
+    if args.command == "batch":
+        manifest_path = Path(args.manifest)
+        manifest = tomllib.loads(manifest_path.read_text())
+        root = manifest_path.parent
+        readme = root / manifest["readme"]
+        layouts = manifest.get("layouts", {})
+        targets = [
+            {**target, "output": str(root / target["output"])}
+            for target in manifest["targets"]
+        ]
+    else:
+        readme = Path(args.readme)
+        layouts = {}
+        targets = [
+            {
+                "output": args.output,
+                **{k: v for k, v in vars(args).items() if k in TARGET_OPTIONS},
+            }
+        ]
+
+    parser = KeymapParser()
+    build_targets(readme, targets, cache, parser, layouts)
+
+    if args.watch:
+        from codegen.watch import rebuild_on_change
+
+        rebuild_on_change(
+            readme,
+            lambda: build_targets(readme, targets, cache, parser, layouts),
+            f"rebuilt {len(targets)} target(s)",
+        )
+
+
+def build_targets(
+    readme: Path,
+    targets: Iterable[Mapping[str, Any]],
+    cache: ArtifactCache,
+    parser: KeymapParser | None = None,
+    layouts: Mapping[str, str] | None = None,
+):
+    readme_bytes = readme.read_bytes()
+    readme_digest = bytes_digest(readme_bytes)
+    all_layouts = {**ALT_LAYOUTS, **(layouts or {})}
+
+    outputs: list[tuple[str, bytes | None]] = []
+    pending: dict[int, tuple[str, dict[str, Any]]] = {}
+    for i, target in enumerate(targets):
+        options = {k: v for k, v in target.items() if k in TARGET_OPTIONS}
+        reshape = options.get("reshape")
+        key = cache.key(
+            readme_digest,
+            {
+                **options,
+                "reshape": reshape and all_layouts[reshape],
+                "compress": target["output"].endswith(".svgz"),
+            },
+        )
+        data = cache.get(key)
+        if data is None:
+            pending[i] = key, options
+        outputs.append((target["output"], data))
+
+    if pending:
+        index = MarkdownIndex(readme_bytes)
+        keymap, titles = (parser or default_keymap_parser()).parse(index)
+        os_specifics = dict(extract_os_specifics_from_md(index))
+        # reshape every layer once per layout needed, then generate from those
+        keymaps = reshape_keymaps(
+            keymap, (options.get("reshape") for _, options in pending.values()), layouts
+        )
+        for i, (key, options) in pending.items():
+            output = outputs[i][0]
+            target_keymap = keymaps[options.get("reshape")]
+            target_options = {**options, "reshape": None}
+            if output == "-" or options["command"] == "SVG":
+                data = generate_target(
+                    target_keymap, titles, os_specifics, target_options, output
+                )
+                cache.put(key, data)
+                outputs[i] = output, data
+            else:
+                # stream the code into the output file, it never sits in memory
+                Path(output).parent.mkdir(parents=True, exist_ok=True)
+                with replace_if_changed(output) as sink:
+                    write_target(
+                        sink, target_keymap, titles, os_specifics, target_options
+                    )
+                cache.put_file(key, output)
+
+    for output, data in outputs:
+        if data is None:
+            continue
+        if output == "-":
+            sys.stdout.buffer.write(data)
+            sys.stdout.flush()
+        else:
+            Path(output).parent.mkdir(parents=True, exist_ok=True)
+            write_if_changed(output, data)
+
+
+def analyzed_reshapes(reshape: str | None = None) -> list[str | None]:
+    if reshape:
+        return [reshape]
+    return [None, *(k for k in ALT_LAYOUTS if k != "source")]
+
+
+def analyze_targets(
+    readme: Path,
+    firmwares: Sequence[str],
+    reshapes: Sequence[str | None],
+    parser: KeymapParser | None = None,
+):
+    from codegen.footprint import analyze_qmk, analyze_zmk
+    from codegen.qmk import QmkLayoutModel
+
+    index = MarkdownIndex(readme.read_bytes())
+    keymap, _titles = (parser or default_keymap_parser()).parse(index)
+    os_specifics = dict(extract_os_specifics_from_md(index))
+    keymaps = reshape_keymaps(keymap, reshapes)
+    for reshape in reshapes:
+        multi_os_layers = list(
+            make_multi_os_layers(keymaps[reshape].layers, os_specifics)
+        )
+        for firmware in firmwares:
+            if firmware == "ZMK":
+                model = ZmkKeymapModel.Build(multi_os_layers, zmk_aliases_for_os)
+                yield analyze_zmk(model, reshape or "default")
+            else:
+                model = QmkLayoutModel.Build(multi_os_layers, qmk_aliases_for_os)
+                yield analyze_qmk(model, reshape or "default")
+
+
+def generate_target(
+    keymap: Keymap[str, Key],
+    titles: Mapping[str, str],
+    os_specifics: dict[str, dict[str, str]],
+    options: Mapping[str, Any],
+    output: str = "",
+) -> bytes:
+    if options["command"] == "SVG":
+        from render_svg import render_svg
+
+        layers = options.get("layers")
+        return render_svg(
+            keymap,
+            layers.split(",") if layers else None,
+            columns=options.get("columns", 2),
+            compress=output.endswith(".svgz"),
+        )
+
+    sink = StringIO()
+    write_target(sink, keymap, titles, os_specifics, options)
+    return sink.getvalue().encode()
+
+
+def write_target(
+    sink: TextIO,
+    keymap: Keymap[str, Key],
+    titles: Mapping[str, str],
+    os_specifics: dict[str, dict[str, str]],
+    options: Mapping[str, Any],
+):
+    target_keymap = reshape_keymap(keymap, options.get("reshape"))
+    multi_os_layers = make_multi_os_layers(target_keymap.layers, os_specifics)
+    write_code(
+        sink, options["command"], target_keymap, titles, multi_os_layers, options
     )
-    if args.command == "ZMK":
-        code = generate_zmk_keymap_code(
+
+
+def write_code(
+    sink: TextIO,
+    command: str,
+    keymap: Keymap[str, Key],
+    titles: Mapping[str, str],
+    multi_os_layers: Iterable[tuple[tuple[str, str], Sequence[Key]]],
+    options: Mapping[str, Any],
+):
+    if command == "ZMK":
+        write_zmk_keymap_code(
+            sink,
             keymap,
             titles,
             multi_os_layers,
-            transform_name=args.transform,
+            transform_name=options.get("transform") or "default_transform",
             aliases_for_os=zmk_aliases_for_os,
             extra_includes=(
                 "behaviors/capslock.dtsi",
                 "behaviors/base_layer.dtsi",
             ),
         )
-    elif args.command == "QMK":
-        code = [
-            generate_qmk_layout_code(
-                keymap,
-                titles,
-                multi_os_layers,
-                layout_name=args.layout,
-                aliases_for_os=qmk_aliases_for_os,
-            )
-        ]
-    else:
-        raise ValueError(f"invalid command: {args.command}")
+    elif command == "QMK":
+        from codegen.qmk import write_qmk_layout_code
 
-    if args.output == "-":
-        print_line(code)
+        write_qmk_layout_code(
+            sink,
+            keymap,
+            titles,
+            multi_os_layers,
+            layout_name=options.get("layout") or "LAYOUT",
+            aliases_for_os=qmk_aliases_for_os,
+        )
+        sink.write("\n")
     else:
-        with open(args.output, "w") as f:
-            print_line(code, f)
+        raise ValueError(f"invalid command: {command}")
 
 
+@cache_result
 def zmk_aliases_for_os(
     os: str,
 ) -> dict[str, str | Binding | Callable[[re.Match[str]], str | Binding]]:
@@ -142,9 +430,12 @@ def zmk_aliases_for_os(
     }
 
 
+@cache_result
 def qmk_aliases_for_os(
     os: str,
 ) -> dict[str, str | QmkBinding | Callable[[re.Match[str]], str | QmkBinding]]:
+    from codegen.qmk import CustomShift, QmkKey
+
     return {
         "PLAY": "MPLY",
         "STOP": "MSTP",
@@ -176,12 +467,5 @@ def qmk_aliases_for_os(
     }
 
 
-def print_line(lines: Iterable[str], f: TextIO = sys.stdout):
-    for line in lines:
-        f.write(line)
-        f.write("\n")
-    f.flush()
-
-
 if __name__ == "__main__":
     exit(main(argument_parser().parse_args()))
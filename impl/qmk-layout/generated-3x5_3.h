@@ -38,22 +38,22 @@ const uint16_t PROGMEM keymaps[][MATRIX_ROWS][MATRIX_COLS] = {
 	                  │ ESC ▼MOU │ SPACE ▼NAV │ TAB ▼SYS │ │ ENTER ▼NUM │ BSPC ▼SYM │ DEL ▼FUN │                  
 	                  └──────────┴────────────┴──────────┘ └────────────┴───────────┴──────────┘                   */
 	[base_l] = LAYOUT_split_3x5_3(
-		 KC_Q,         KC_W,         KC_F,              KC_P,              KC_B,                KC_J,              KC_L,               KC_U,              KC_Y,         KC_QUOT,
-		 LGUI_T(KC_A), LALT_T(KC_R), LCTL_T(KC_S),      LSFT_T(KC_T),      KC_G,                KC_M,              LSFT_T(KC_N),       LCTL_T(KC_E),      LALT_T(KC_I), LGUI_T(KC_O),
-		 KC_Z,         KC_X,         KC_C,              KC_D,              KC_V,                KC_K,              KC_H,               KC_COMM,           KC_DOT,       KC_SLSH,
-		                             LT(MOU_lw,KC_ESC), LT(NAV_lw,KC_SPC), LT(SYS_lw,KC_TAB),   LT(NUM_lw,KC_ENT), LT(SYM_lw,KC_BSPC), LT(FUN_lw,KC_DEL)
+		 KC_Q,             KC_W,         KC_F,              KC_P,              KC_B,                KC_J,              KC_L,                  KC_U,              KC_Y,         KC_QUOT,
+		 LGUI_T(KC_A),     LALT_T(KC_R), LCTL_T(KC_S),      LSFT_T(KC_T),      KC_G,                KC_M,              LSFT_T(KC_N),          LCTL_T(KC_E),      LALT_T(KC_I), LGUI_T(KC_O),
+		 KC_Z,             KC_X,         KC_C,              KC_D,              KC_V,                KC_K,              KC_H,                  KC_COMM,           KC_DOT,       KC_SLSH,
+		                                 LT(MOU_lw,KC_ESC), LT(NAV_lw,KC_SPC), LT(SYS_lw,KC_TAB),   LT(NUM_lw,KC_ENT), LT(SYM_lw,KC_BSPC),    LT(FUN_lw,KC_DEL)
 	),
 	[base_m] = LAYOUT_split_3x5_3(
-		 KC_Q,         KC_W,         KC_F,             KC_P,             KC_B,               KC_J,             KC_L,              KC_U,             KC_Y,         KC_QUOT,
-		 LCTL_T(KC_A), LALT_T(KC_R), LGUI_T(KC_S),     LSFT_T(KC_T),     KC_G,               KC_M,             LSFT_T(KC_N),      LGUI_T(KC_E),     LALT_T(KC_I), LCTL_T(KC_O),
-		 KC_Z,         KC_X,         KC_C,             KC_D,             KC_V,               KC_K,             KC_H,              KC_COMM,          KC_DOT,       KC_SLSH,
-		                             LT(MOU_m,KC_ESC), LT(NAV_m,KC_SPC), LT(SYS_m,KC_TAB),   LT(NUM_m,KC_ENT), LT(SYM_m,KC_BSPC), LT(FUN_m,KC_DEL)
+		 KC_Q,             KC_W,         KC_F,              KC_P,              KC_B,                KC_J,              KC_L,                  KC_U,              KC_Y,         KC_QUOT,
+		 LCTL_T(KC_A),     LALT_T(KC_R), LGUI_T(KC_S),      LSFT_T(KC_T),      KC_G,                KC_M,              LSFT_T(KC_N),          LGUI_T(KC_E),      LALT_T(KC_I), LCTL_T(KC_O),
+		 KC_Z,             KC_X,         KC_C,              KC_D,              KC_V,                KC_K,              KC_H,                  KC_COMM,           KC_DOT,       KC_SLSH,
+		                                 LT(MOU_m,KC_ESC),  LT(NAV_m,KC_SPC),  LT(SYS_m,KC_TAB),    LT(NUM_m,KC_ENT),  LT(SYM_m,KC_BSPC),     LT(FUN_m,KC_DEL)
 	),
 	[base_w] = LAYOUT_split_3x5_3(
-		 KC_Q,         KC_W,         KC_F,              KC_P,              KC_B,                KC_J,              KC_L,               KC_U,              KC_Y,         KC_QUOT,
-		 LGUI_T(KC_A), LALT_T(KC_R), LCTL_T(KC_S),      LSFT_T(KC_T),      KC_G,                KC_M,              LSFT_T(KC_N),       LCTL_T(KC_E),      LALT_T(KC_I), LGUI_T(KC_O),
-		 KC_Z,         KC_X,         KC_C,              KC_D,              KC_V,                KC_K,              KC_H,               KC_COMM,           KC_DOT,       KC_SLSH,
-		                             LT(MOU_lw,KC_ESC), LT(NAV_lw,KC_SPC), LT(SYS_lw,KC_TAB),   LT(NUM_lw,KC_ENT), LT(SYM_lw,KC_BSPC), LT(FUN_lw,KC_DEL)
+		 KC_Q,             KC_W,         KC_F,              KC_P,              KC_B,                KC_J,              KC_L,                  KC_U,              KC_Y,         KC_QUOT,
+		 LGUI_T(KC_A),     LALT_T(KC_R), LCTL_T(KC_S),      LSFT_T(KC_T),      KC_G,                KC_M,              LSFT_T(KC_N),          LCTL_T(KC_E),      LALT_T(KC_I), LGUI_T(KC_O),
+		 KC_Z,             KC_X,         KC_C,              KC_D,              KC_V,                KC_K,              KC_H,                  KC_COMM,           KC_DOT,       KC_SLSH,
+		                                 LT(MOU_lw,KC_ESC), LT(NAV_lw,KC_SPC), LT(SYS_lw,KC_TAB),   LT(NUM_lw,KC_ENT), LT(SYM_lw,KC_BSPC),    LT(FUN_lw,KC_DEL)
 	),
 	/* Symbols (`SYM`)
 	┌───────┬───────┬───────┬───────┬───────┐ ┌───────┬───────┬───────┬───────┬───────┐
@@ -66,16 +66,16 @@ const uint16_t PROGMEM keymaps[][MATRIX_ROWS][MATRIX_COLS] = {
 	                │   +   │   _   │   =   │ │  ▼KP  │  XXX  │       │                
 	                └───────┴───────┴───────┘ └───────┴───────┴───────┘                 */
 	[SYM_lw] = LAYOUT_split_3x5_3(
-		 KC_TILD, KC_CIRC, KC_AMPR, KC_LBRC, KC_RBRC,   KC_NO,     KC_NO,   KC_NO,   KC_NO,   KC_GRV,
-		 KC_AT,   KC_HASH, KC_DLR,  KC_LPRN, KC_RPRN,   KC_NO,     KC_LSFT, KC_LCTL, KC_LALT, KC_LGUI,
-		 KC_ASTR, KC_NO,   KC_PERC, KC_LCBR, KC_RCBR,   KC_NO,     KC_NO,   KC_COLN, KC_EXLM, KC_PIPE,
-		                   KC_PLUS, KC_UNDS, KC_EQL,    MO(KP_lw), KC_NO,   KC_NO
+		 KC_TILD,          KC_CIRC,      KC_AMPR,           KC_LBRC,           KC_RBRC,             KC_NO,             KC_NO,                 KC_NO,             KC_NO,        KC_GRV,
+		 KC_AT,            KC_HASH,      KC_DLR,            KC_LPRN,           KC_RPRN,             KC_NO,             KC_LSFT,               KC_LCTL,           KC_LALT,      KC_LGUI,
+		 KC_ASTR,          KC_NO,        KC_PERC,           KC_LCBR,           KC_RCBR,             KC_NO,             KC_NO,                 KC_COLN,           KC_EXLM,      KC_PIPE,
+		                                 KC_PLUS,           KC_UNDS,           KC_EQL,              MO(KP_lw),         KC_NO,                 KC_NO
 	),
 	[SYM_m] = LAYOUT_split_3x5_3(
-		 KC_TILD, KC_CIRC, KC_AMPR, KC_LBRC, KC_RBRC,   KC_NO,    KC_NO,   KC_NO,   KC_NO,   KC_GRV,
-		 KC_AT,   KC_HASH, KC_DLR,  KC_LPRN, KC_RPRN,   KC_NO,    KC_LSFT, KC_LGUI, KC_LALT, KC_LCTL,
-		 KC_ASTR, KC_NO,   KC_PERC, KC_LCBR, KC_RCBR,   KC_NO,    KC_NO,   KC_COLN, KC_EXLM, KC_PIPE,
-		                   KC_PLUS, KC_UNDS, KC_EQL,    MO(KP_m), KC_NO,   KC_NO
+		 KC_TILD,          KC_CIRC,      KC_AMPR,           KC_LBRC,           KC_RBRC,             KC_NO,             KC_NO,                 KC_NO,             KC_NO,        KC_GRV,
+		 KC_AT,            KC_HASH,      KC_DLR,            KC_LPRN,           KC_RPRN,             KC_NO,             KC_LSFT,               KC_LGUI,           KC_LALT,      KC_LCTL,
+		 KC_ASTR,          KC_NO,        KC_PERC,           KC_LCBR,           KC_RCBR,             KC_NO,             KC_NO,                 KC_COLN,           KC_EXLM,      KC_PIPE,
+		                                 KC_PLUS,           KC_UNDS,           KC_EQL,              MO(KP_m),          KC_NO,                 KC_NO
 	),
 	/* Numerals (`NUM`)
 	┌───────┬───────┬───────┬───────┬───────┐ ┌───────┬───────┬───────────┬───────┬───────┐
@@ -88,16 +88,16 @@ const uint16_t PROGMEM keymaps[][MATRIX_ROWS][MATRIX_COLS] = {
 	                │   +   │   -   │   =   │ │  XXX  │  ▼KP  │ NLOCK ▼FW │                
 	                └───────┴───────┴───────┘ └───────┴───────┴───────────┘                 */
 	[NUM_lw] = LAYOUT_split_3x5_3(
-		 KC_1,    KC_2,    KC_3,    KC_4,    KC_5,     KC_6,    KC_7,      KC_8,              KC_9, KC_0,
-		 KC_LGUI, KC_LALT, KC_LCTL, KC_LSFT, KC_NO,    KC_MINS, KC_4,      KC_5,              KC_6, KC_DOT,
-		 KC_ASTR, KC_NO,   KC_PERC, KC_LT,   KC_GT,    KC_0,    KC_1,      KC_2,              KC_3, KC_SLSH,
-		                   KC_PLUS, KC_MINS, KC_EQL,   KC_NO,   MO(KP_lw), LT(FW_lmw,KC_NUM)
+		 KC_1,             KC_2,         KC_3,              KC_4,              KC_5,                KC_6,              KC_7,                  KC_8,              KC_9,         KC_0,
+		 KC_LGUI,          KC_LALT,      KC_LCTL,           KC_LSFT,           KC_NO,               KC_MINS,           KC_4,                  KC_5,              KC_6,         KC_DOT,
+		 KC_ASTR,          KC_NO,        KC_PERC,           KC_LT,             KC_GT,               KC_0,              KC_1,                  KC_2,              KC_3,         KC_SLSH,
+		                                 KC_PLUS,           KC_MINS,           KC_EQL,              KC_NO,             MO(KP_lw),             LT(FW_lmw,KC_NUM)
 	),
 	[NUM_m] = LAYOUT_split_3x5_3(
-		 KC_1,    KC_2,    KC_3,    KC_4,    KC_5,     KC_6,    KC_7,     KC_8,              KC_9, KC_0,
-		 KC_LCTL, KC_LALT, KC_LGUI, KC_LSFT, KC_NO,    KC_MINS, KC_4,     KC_5,              KC_6, KC_DOT,
-		 KC_ASTR, KC_NO,   KC_PERC, KC_LT,   KC_GT,    KC_0,    KC_1,     KC_2,              KC_3, KC_SLSH,
-		                   KC_PLUS, KC_MINS, KC_EQL,   KC_NO,   MO(KP_m), LT(FW_lmw,KC_NUM)
+		 KC_1,             KC_2,         KC_3,              KC_4,              KC_5,                KC_6,              KC_7,                  KC_8,              KC_9,         KC_0,
+		 KC_LCTL,          KC_LALT,      KC_LGUI,           KC_LSFT,           KC_NO,               KC_MINS,           KC_4,                  KC_5,              KC_6,         KC_DOT,
+		 KC_ASTR,          KC_NO,        KC_PERC,           KC_LT,             KC_GT,               KC_0,              KC_1,                  KC_2,              KC_3,         KC_SLSH,
+		                                 KC_PLUS,           KC_MINS,           KC_EQL,              KC_NO,             MO(KP_m),              LT(FW_lmw,KC_NUM)
 	),
 	/* Keypad numerals (`KP`) on `NUM+SYM` combo
 	┌───────┬───────┬───────┬───────┬───────┐ ┌───────┬───────┬───────┬───────┬───────┐
@@ -110,16 +110,16 @@ const uint16_t PROGMEM keymaps[][MATRIX_ROWS][MATRIX_COLS] = {
 	                │  KP+  │  KP-  │  KP=  │ │  XXX  │  XXX  │       │                
 	                └───────┴───────┴───────┘ └───────┴───────┴───────┘                 */
 	[KP_lw] = LAYOUT_split_3x5_3(
-		 KC_P1,   KC_P2,   KC_P3,   KC_P4,   KC_P5,     KC_P6,   KC_P7, KC_P8, KC_P9, KC_P0,
-		 KC_LGUI, KC_LALT, KC_LCTL, KC_LSFT, KC_NO,     KC_PMNS, KC_P4, KC_P5, KC_P6, KC_PDOT,
-		 KC_PAST, KC_NO,   KC_PERC, KC_LT,   KC_GT,     KC_P0,   KC_P1, KC_P2, KC_P3, KC_PSLS,
-		                   KC_PPLS, KC_PMNS, KC_PEQL,   KC_NO,   KC_NO, KC_NO
+		 KC_P1,            KC_P2,        KC_P3,             KC_P4,             KC_P5,               KC_P6,             KC_P7,                 KC_P8,             KC_P9,        KC_P0,
+		 KC_LGUI,          KC_LALT,      KC_LCTL,           KC_LSFT,           KC_NO,               KC_PMNS,           KC_P4,                 KC_P5,             KC_P6,        KC_PDOT,
+		 KC_PAST,          KC_NO,        KC_PERC,           KC_LT,             KC_GT,               KC_P0,             KC_P1,                 KC_P2,             KC_P3,        KC_PSLS,
+		                                 KC_PPLS,           KC_PMNS,           KC_PEQL,             KC_NO,             KC_NO,                 KC_NO
 	),
 	[KP_m] = LAYOUT_split_3x5_3(
-		 KC_P1,   KC_P2,   KC_P3,   KC_P4,   KC_P5,     KC_P6,   KC_P7, KC_P8, KC_P9, KC_P0,
-		 KC_LCTL, KC_LALT, KC_LGUI, KC_LSFT, KC_NO,     KC_PMNS, KC_P4, KC_P5, KC_P6, KC_PDOT,
-		 KC_PAST, KC_NO,   KC_PERC, KC_LT,   KC_GT,     KC_P0,   KC_P1, KC_P2, KC_P3, KC_PSLS,
-		                   KC_PPLS, KC_PMNS, KC_PEQL,   KC_NO,   KC_NO, KC_NO
+		 KC_P1,            KC_P2,        KC_P3,             KC_P4,             KC_P5,               KC_P6,             KC_P7,                 KC_P8,             KC_P9,        KC_P0,
+		 KC_LCTL,          KC_LALT,      KC_LGUI,           KC_LSFT,           KC_NO,               KC_PMNS,           KC_P4,                 KC_P5,             KC_P6,        KC_PDOT,
+		 KC_PAST,          KC_NO,        KC_PERC,           KC_LT,             KC_GT,               KC_P0,             KC_P1,                 KC_P2,             KC_P3,        KC_PSLS,
+		                                 KC_PPLS,           KC_PMNS,           KC_PEQL,             KC_NO,             KC_NO,                 KC_NO
 	),
 	/* Function keys (`FUN`)
 	┌───────┬───────┬───────┬───────┬───────┐ ┌───────┬───────┬───────┬───────┬───────┐
@@ -132,16 +132,16 @@ const uint16_t PROGMEM keymaps[][MATRIX_ROWS][MATRIX_COLS] = {
 	                │ rCTRL │  APP  │       │ │  ▼FW  │       │  XXX  │                
 	                └───────┴───────┴───────┘ └───────┴───────┴───────┘                 */
 	[FUN_lw] = LAYOUT_split_3x5_3(
-		 KC_F1,   KC_F2,   KC_F3,   KC_F4,   KC_F5,    KC_F6,      KC_F7, KC_F8, KC_F9, KC_F10,
-		 KC_LGUI, KC_LALT, KC_LCTL, KC_LSFT, KC_NO,    KC_PSCR,    KC_F4, KC_F5, KC_F6, KC_F11,
-		 KC_NO,   KC_PSCR, KC_SCRL, KC_NO,   KC_INS,   KC_NO,      KC_F1, KC_F2, KC_F3, KC_F12,
-		                   KC_RCTL, KC_APP,  KC_NO,    MO(FW_lmw), KC_NO, KC_NO
+		 KC_F1,            KC_F2,        KC_F3,             KC_F4,             KC_F5,               KC_F6,             KC_F7,                 KC_F8,             KC_F9,        KC_F10,
+		 KC_LGUI,          KC_LALT,      KC_LCTL,           KC_LSFT,           KC_NO,               KC_PSCR,           KC_F4,                 KC_F5,             KC_F6,        KC_F11,
+		 KC_NO,            KC_PSCR,      KC_SCRL,           KC_NO,             KC_INS,              KC_NO,             KC_F1,                 KC_F2,             KC_F3,        KC_F12,
+		                                 KC_RCTL,           KC_APP,            KC_NO,               MO(FW_lmw),        KC_NO,                 KC_NO
 	),
 	[FUN_m] = LAYOUT_split_3x5_3(
-		 KC_F1,   KC_F2,   KC_F3,   KC_F4,   KC_F5,    KC_F6,      KC_F7, KC_F8, KC_F9, KC_F10,
-		 KC_LCTL, KC_LALT, KC_LGUI, KC_LSFT, KC_NO,    KC_PSCR,    KC_F4, KC_F5, KC_F6, KC_F11,
-		 KC_NO,   KC_PSCR, KC_SCRL, KC_NO,   KC_INS,   KC_NO,      KC_F1, KC_F2, KC_F3, KC_F12,
-		                   KC_RCTL, KC_APP,  KC_NO,    MO(FW_lmw), KC_NO, KC_NO
+		 KC_F1,            KC_F2,        KC_F3,             KC_F4,             KC_F5,               KC_F6,             KC_F7,                 KC_F8,             KC_F9,        KC_F10,
+		 KC_LCTL,          KC_LALT,      KC_LGUI,           KC_LSFT,           KC_NO,               KC_PSCR,           KC_F4,                 KC_F5,             KC_F6,        KC_F11,
+		 KC_NO,            KC_PSCR,      KC_SCRL,           KC_NO,             KC_INS,              KC_NO,             KC_F1,                 KC_F2,             KC_F3,        KC_F12,
+		                                 KC_RCTL,           KC_APP,            KC_NO,               MO(FW_lmw),        KC_NO,                 KC_NO
 	),
 	/* Navigation (`NAV`)
 	┌───────┬───────┬───────┬───────┬───────┐ ┌───────┬───────────┬───────┬───────┬───────┐
@@ -154,16 +154,16 @@ const uint16_t PROGMEM keymaps[][MATRIX_ROWS][MATRIX_COLS] = {
 	                │       │  XXX  │       │ │ REDO  │ UNDO ▼UTF │       │                
 	                └───────┴───────┴───────┘ └───────┴───────────┴───────┘                 */
 	[NAV_lw] = LAYOUT_split_3x5_3(
-		 LSFT(KC_F3), KC_HOME, KC_UP,   KC_END,  LCTL(KC_X),   KC_NO,      KC_NO,                 KC_NO,   KC_NO,   KC_DQT,
-		 KC_F3,       KC_LEFT, KC_DOWN, KC_RGHT, LCTL(KC_C),   KC_NO,      KC_LSFT,               KC_LCTL, KC_LALT, KC_LGUI,
-		 KC_ENT,      KC_PGUP, KC_NO,   KC_PGDN, LCTL(KC_V),   KC_NO,      KC_NO,                 KC_SCLN, KC_QUES, KC_BSLS,
-		                       KC_NO,   KC_NO,   KC_NO,        LCTL(KC_Y), TD(LT_UTF_lmw_LCTL_Z), KC_NO
+		 LSFT(KC_F3),      KC_HOME,      KC_UP,             KC_END,            LCTL(KC_X),          KC_NO,             KC_NO,                 KC_NO,             KC_NO,        KC_DQT,
+		 KC_F3,            KC_LEFT,      KC_DOWN,           KC_RGHT,           LCTL(KC_C),          KC_NO,             KC_LSFT,               KC_LCTL,           KC_LALT,      KC_LGUI,
+		 KC_ENT,           KC_PGUP,      KC_NO,             KC_PGDN,           LCTL(KC_V),          KC_NO,             KC_NO,                 KC_SCLN,           KC_QUES,      KC_BSLS,
+		                                 KC_NO,             KC_NO,             KC_NO,               LCTL(KC_Y),        TD(LT_UTF_lmw_LCTL_Z), KC_NO
 	),
 	[NAV_m] = LAYOUT_split_3x5_3(
-		 LSFT(LGUI(KC_G)), KC_HOME, KC_UP,   KC_END,  LGUI(KC_X),   KC_NO,      KC_NO,                 KC_NO,   KC_NO,   KC_DQT,
-		 LGUI(KC_G),       KC_LEFT, KC_DOWN, KC_RGHT, LGUI(KC_C),   KC_NO,      KC_LSFT,               KC_LGUI, KC_LALT, KC_LCTL,
-		 KC_ENT,           KC_PGUP, KC_NO,   KC_PGDN, LGUI(KC_V),   KC_NO,      KC_NO,                 KC_SCLN, KC_QUES, KC_BSLS,
-		                            KC_NO,   KC_NO,   KC_NO,        LGUI(KC_Y), TD(LT_UTF_lmw_LGUI_Z), KC_NO
+		 LSFT(LGUI(KC_G)), KC_HOME,      KC_UP,             KC_END,            LGUI(KC_X),          KC_NO,             KC_NO,                 KC_NO,             KC_NO,        KC_DQT,
+		 LGUI(KC_G),       KC_LEFT,      KC_DOWN,           KC_RGHT,           LGUI(KC_C),          KC_NO,             KC_LSFT,               KC_LGUI,           KC_LALT,      KC_LCTL,
+		 KC_ENT,           KC_PGUP,      KC_NO,             KC_PGDN,           LGUI(KC_V),          KC_NO,             KC_NO,                 KC_SCLN,           KC_QUES,      KC_BSLS,
+		                                 KC_NO,             KC_NO,             KC_NO,               LGUI(KC_Y),        TD(LT_UTF_lmw_LGUI_Z), KC_NO
 	),
 	/* System/media keys (`SYS`)
 	┌───────┬───────┬───────┬───────┬────────┐ ┌───────┬───────┬───────┬───────┬───────┐
@@ -176,16 +176,16 @@ const uint16_t PROGMEM keymaps[][MATRIX_ROWS][MATRIX_COLS] = {
 	                │  ▼FW  │       │   XXX  │ │       │       │       │                
 	                └───────┴───────┴────────┘ └───────┴───────┴───────┘                 */
 	[SYS_lw] = LAYOUT_split_3x5_3(
-		 KC_BRIU, KC_MRWD, KC_VOLU,    KC_MFFD, KC_WHOM,   KC_NO, KC_NO,   KC_NO,   KC_NO,   KC_NO,
-		 KC_BRID, KC_MSTP, KC_VOLD,    KC_MPLY, KC_MYCM,   KC_NO, KC_LSFT, KC_LCTL, KC_LALT, KC_LGUI,
-		 KC_NO,   KC_MPRV, KC_MUTE,    KC_MNXT, KC_CALC,   KC_NO, KC_NO,   KC_NO,   KC_NO,   KC_NO,
-		                   MO(FW_lmw), KC_NO,   KC_NO,     KC_NO, KC_NO,   KC_NO
+		 KC_BRIU,          KC_MRWD,      KC_VOLU,           KC_MFFD,           KC_WHOM,             KC_NO,             KC_NO,                 KC_NO,             KC_NO,        KC_NO,
+		 KC_BRID,          KC_MSTP,      KC_VOLD,           KC_MPLY,           KC_MYCM,             KC_NO,             KC_LSFT,               KC_LCTL,           KC_LALT,      KC_LGUI,
+		 KC_NO,            KC_MPRV,      KC_MUTE,           KC_MNXT,           KC_CALC,             KC_NO,             KC_NO,                 KC_NO,             KC_NO,        KC_NO,
+		                                 MO(FW_lmw),        KC_NO,             KC_NO,               KC_NO,             KC_NO,                 KC_NO
 	),
 	[SYS_m] = LAYOUT_split_3x5_3(
-		 KC_BRIU, KC_MRWD, KC_VOLU,    KC_MFFD, KC_WHOM,   KC_NO, KC_NO,   KC_NO,   KC_NO,   KC_NO,
-		 KC_BRID, KC_MSTP, KC_VOLD,    KC_MPLY, KC_MYCM,   KC_NO, KC_LSFT, KC_LGUI, KC_LALT, KC_LCTL,
-		 KC_NO,   KC_MPRV, KC_MUTE,    KC_MNXT, KC_CALC,   KC_NO, KC_NO,   KC_NO,   KC_NO,   KC_NO,
-		                   MO(FW_lmw), KC_NO,   KC_NO,     KC_NO, KC_NO,   KC_NO
+		 KC_BRIU,          KC_MRWD,      KC_VOLU,           KC_MFFD,           KC_WHOM,             KC_NO,             KC_NO,                 KC_NO,             KC_NO,        KC_NO,
+		 KC_BRID,          KC_MSTP,      KC_VOLD,           KC_MPLY,           KC_MYCM,             KC_NO,             KC_LSFT,               KC_LGUI,           KC_LALT,      KC_LCTL,
+		 KC_NO,            KC_MPRV,      KC_MUTE,           KC_MNXT,           KC_CALC,             KC_NO,             KC_NO,                 KC_NO,             KC_NO,        KC_NO,
+		                                 MO(FW_lmw),        KC_NO,             KC_NO,               KC_NO,             KC_NO,                 KC_NO
 	),
 	/* Mouse Emulation (`MOU`)
 	┌───────┬───────┬───────┬───────┬───────┐ ┌───────┬───────┬───────┬───────┬───────┐
@@ -198,16 +198,16 @@ const uint16_t PROGMEM keymaps[][MATRIX_ROWS][MATRIX_COLS] = {
 	                │  XXX  │       │  ▼FW  │ │       │       │       │                
 	                └───────┴───────┴───────┘ └───────┴───────┴───────┘                 */
 	[MOU_lw] = LAYOUT_split_3x5_3(
-		 KC_NO, KC_NO, KC_NO, KC_NO, KC_NO,        KC_NO, KC_NO,   KC_NO,   KC_NO,   KC_NO,
-		 KC_NO, KC_NO, KC_NO, KC_NO, KC_NO,        KC_NO, KC_LSFT, KC_LCTL, KC_LALT, KC_LGUI,
-		 KC_NO, KC_NO, KC_NO, KC_NO, KC_NO,        KC_NO, KC_NO,   KC_NO,   KC_NO,   KC_NO,
-		               KC_NO, KC_NO, MO(FW_lmw),   KC_NO, KC_NO,   KC_NO
+		 KC_NO,            KC_NO,        KC_NO,             KC_NO,             KC_NO,               KC_NO,             KC_NO,                 KC_NO,             KC_NO,        KC_NO,
+		 KC_NO,            KC_NO,        KC_NO,             KC_NO,             KC_NO,               KC_NO,             KC_LSFT,               KC_LCTL,           KC_LALT,      KC_LGUI,
+		 KC_NO,            KC_NO,        KC_NO,             KC_NO,             KC_NO,               KC_NO,             KC_NO,                 KC_NO,             KC_NO,        KC_NO,
+		                                 KC_NO,             KC_NO,             MO(FW_lmw),          KC_NO,             KC_NO,                 KC_NO
 	),
 	[MOU_m] = LAYOUT_split_3x5_3(
-		 KC_NO, KC_NO, KC_NO, KC_NO, KC_NO,        KC_NO, KC_NO,   KC_NO,   KC_NO,   KC_NO,
-		 KC_NO, KC_NO, KC_NO, KC_NO, KC_NO,        KC_NO, KC_LSFT, KC_LGUI, KC_LALT, KC_LCTL,
-		 KC_NO, KC_NO, KC_NO, KC_NO, KC_NO,        KC_NO, KC_NO,   KC_NO,   KC_NO,   KC_NO,
-		               KC_NO, KC_NO, MO(FW_lmw),   KC_NO, KC_NO,   KC_NO
+		 KC_NO,            KC_NO,        KC_NO,             KC_NO,             KC_NO,               KC_NO,             KC_NO,                 KC_NO,             KC_NO,        KC_NO,
+		 KC_NO,            KC_NO,        KC_NO,             KC_NO,             KC_NO,               KC_NO,             KC_LSFT,               KC_LGUI,           KC_LALT,      KC_LCTL,
+		 KC_NO,            KC_NO,        KC_NO,             KC_NO,             KC_NO,               KC_NO,             KC_NO,                 KC_NO,             KC_NO,        KC_NO,
+		                                 KC_NO,             KC_NO,             MO(FW_lmw),          KC_NO,             KC_NO,                 KC_NO
 	),
 	/* Unicode Symbols (`UTF`) on `NAV>SYM`
 	┌───────┬───────┬───────┬───────┬───────┐ ┌───────┬───────┬───────┬───────┬───────┐
@@ -220,10 +220,10 @@ const uint16_t PROGMEM keymaps[][MATRIX_ROWS][MATRIX_COLS] = {
 	                │   ±   │  XXX  │   ≠   │ │       │       │  XXX  │                
 	                └───────┴───────┴───────┘ └───────┴───────┴───────┘                 */
 	[UTF_lmw] = LAYOUT_split_3x5_3(
-		 UC(0x2248), KC_NO,      KC_NO,      UC(0x221a), UC(0x221b),   KC_NO,      UC(0x03bc), UC(0x0394), UC(0x03b5), KC_NO,
-		 UC(0x221e), UC(0x20ac), KC_NO,      UC(0x00b2), UC(0x00b3),   KC_NO,      UC(0x03c0), UC(0x03c6), UC(0x03b8), KC_NO,
-		 UC(0x00d7), KC_NO,      UC(0x00b0), UC(0x2264), UC(0x2265),   UC(0x03bb), UC(0x03b1), UC(0x03b2), UC(0x00bf), UC(0x00f7),
-		                         UC(0x00b1), KC_NO,      UC(0x2260),   KC_NO,      KC_NO,      KC_NO
+		 UC(0x2248),       KC_NO,        KC_NO,             UC(0x221a),        UC(0x221b),          KC_NO,             UC(0x03bc),            UC(0x0394),        UC(0x03b5),   KC_NO,
+		 UC(0x221e),       UC(0x20ac),   KC_NO,             UC(0x00b2),        UC(0x00b3),          KC_NO,             UC(0x03c0),            UC(0x03c6),        UC(0x03b8),   KC_NO,
+		 UC(0x00d7),       KC_NO,        UC(0x00b0),        UC(0x2264),        UC(0x2265),          UC(0x03bb),        UC(0x03b1),            UC(0x03b2),        UC(0x00bf),   UC(0x00f7),
+		                                 UC(0x00b1),        KC_NO,             UC(0x2260),          KC_NO,             KC_NO,                 KC_NO
 	),
 	/* Firmware (`FW`) on `NUM+FUN` or `MOU+SYS` combo
 	┌───────┬───────┬───────┬────────┬───────┐ ┌───────┬───────┬───────┬───────┬───────┐
@@ -236,10 +236,10 @@ const uint16_t PROGMEM keymaps[][MATRIX_ROWS][MATRIX_COLS] = {
 	                │       │  BOOTL │       │ │       │ BOOTL │       │                
 	                └───────┴────────┴───────┘ └───────┴───────┴───────┘                 */
 	[FW_lmw] = LAYOUT_split_3x5_3(
-		 KC_NO, KC_NO, KC_NO, KC_NO,  KC_NO,   KC_NO, KC_NO,  KC_NO, KC_NO, KC_NO,
-		 KC_NO, KC_NO, KC_NO, KC_NO,  KC_NO,   KC_NO, KC_NO,  KC_NO, KC_NO, KC_NO,
-		 KC_NO, KC_NO, KC_NO, KC_NO,  KC_NO,   KC_NO, KC_NO,  KC_NO, KC_NO, KC_NO,
-		               KC_NO, QK_RBT, KC_NO,   KC_NO, QK_RBT, KC_NO
+		 KC_NO,            KC_NO,        KC_NO,             KC_NO,             KC_NO,               KC_NO,             KC_NO,                 KC_NO,             KC_NO,        KC_NO,
+		 KC_NO,            KC_NO,        KC_NO,             KC_NO,             KC_NO,               KC_NO,             KC_NO,                 KC_NO,             KC_NO,        KC_NO,
+		 KC_NO,            KC_NO,        KC_NO,             KC_NO,             KC_NO,               KC_NO,             KC_NO,                 KC_NO,             KC_NO,        KC_NO,
+		                                 KC_NO,             QK_RBT,            KC_NO,               KC_NO,             QK_RBT,                KC_NO
 	)
 };
 
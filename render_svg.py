@@ -6,20 +6,18 @@ import re
 import xml.etree.ElementTree as ET
 from collections import defaultdict
 from dataclasses import dataclass
+from functools import cache
 from io import BytesIO
 from itertools import chain
 from math import ceil, copysign, pi
-from pathlib import Path
 from textwrap import dedent
 from typing import Callable, Iterable, Iterator, Literal, Sequence
 
-import cairocffi
-import networkx
-import pangocairocffi
-import pangocffi
-import svgelements
-
-from codegen.source import Key, base_keymap_from_md, split_mods
+from codegen.cache import write_if_changed
+from codegen.keycode_db import keycode_database
+from codegen.keycodes import parse_keycode
+from codegen.markdown import MarkdownIndex
+from codegen.source import Key, Keymap, KeymapParser
 
 NUMROW = r"""1! 2@ 3# 4$ 5% 6^ 7& 8* 9( 0) -_ =+ [{ ]} ;: '" ,< .> /? \| `~""".split()
 SHIFTED = {k: v for k, v in NUMROW}
@@ -37,11 +35,43 @@ def main():
         "--columns", type=int, default=2, help="number of columns for the grid"
     )
 
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="re-render whenever the readme changes",
+    )
+
     args = parser.parse_args()
 
-    keymap, _titles = base_keymap_from_md(open(args.readme))
+    keymap_parser = KeymapParser()
+
+    def build():
+        keymap, _titles = keymap_parser.parse(MarkdownIndex.Open(args.readme))
+        svg = render_svg(
+            keymap,
+            args.layers.split(",") if args.layers else None,
+            columns=args.columns,
+            compress=args.output.endswith(".svgz"),
+        )
+        write_if_changed(args.output, svg)
+
+    build()
+
+    if args.watch:
+        from codegen.watch import rebuild_on_change
+
+        rebuild_on_change(args.readme, build, f"rendered {args.output}")
+
+
+def render_svg(
+    keymap: Keymap[str, Key],
+    layers: Sequence[str] | None = None,
+    columns: int = 2,
+    compress: bool = False,
+) -> bytes:
+    import networkx
 
-    selected_ids = args.layers.split(",") if args.layers else list(keymap.layers.keys())
+    selected_ids = list(layers) if layers else list(keymap.layers.keys())
 
     g = networkx.DiGraph()
     for layer_name, keys in keymap.layers.items():
@@ -77,14 +107,14 @@ def main():
     svg_rect = Rect(
         layout_rect.x0,
         layout_rect.y0,
-        layout_rect.w * args.columns,
-        layout_rect.h * ceil(len(selected_ids) / args.columns),
+        layout_rect.w * columns,
+        layout_rect.h * ceil(len(selected_ids) / columns),
     )
 
     layer_positions = {
         layer_name: (
-            i % args.columns * layout_rect.w,
-            i // args.columns * layout_rect.h,
+            i % columns * layout_rect.w,
+            i // columns * layout_rect.h,
         )
         for i, layer_name in enumerate(selected_ids)
     }
@@ -167,15 +197,7 @@ def main():
                 for text, legend_rect, align in key_sublegends(key, rect.pad(-0.1)):
                     if legend := label_to_pango(text):
                         if legend not in known_legends:
-                            is_mod = any(x in legend for x in "⇧⌘⌥◆☰⌃")
-                            legend_path, bbox = render_text(
-                                legend,
-                                font=["Deja Vu", "Intel One Mono"],
-                                size=0.25,
-                                align=align,
-                                strict_bbox=is_mod,
-                            )
-                            svg_path = cairo_path_to_svg(legend_path)
+                            svg_path, bbox = render_legend(legend, align)
                             sym_id = f"x{len(known_legends)}"
                             known_legends[legend] = sym_id, bbox
 
@@ -204,9 +226,9 @@ def main():
                         b = a + (q - a) / 3
                         c = d + (q - d) / 3
                         p: CairoPath = [
-                            (cairocffi.PATH_MOVE_TO, (a.real, a.imag)),
+                            (PATH_MOVE_TO, (a.real, a.imag)),
                             (
-                                cairocffi.PATH_CURVE_TO,
+                                PATH_CURVE_TO,
                                 (b.real, b.imag, c.real, c.imag, d.real, d.imag),
                             ),
                         ]
@@ -228,12 +250,9 @@ def main():
     ET.indent(svg)
     tree = ET.ElementTree(svg)
 
-    if args.output.endswith(".svgz"):
-        buf = BytesIO()
-        tree.write(buf)
-        Path(args.output).write_bytes(gzip.compress(buf.getvalue()))
-    else:
-        tree.write(args.output)
+    buf = BytesIO()
+    tree.write(buf)
+    return gzip.compress(buf.getvalue(), mtime=0) if compress else buf.getvalue()
 
 
 def material_icon(*codepoints: Sequence[str]) -> str:
@@ -262,26 +281,20 @@ def lock_label(name: str, sub: str = ""):
         return text_label(name, material_icon("e897"))
 
 
-SYMBOLS = {
-    "CMD": "⌘",
+@cache
+def symbols():
+    return {**keycode_database().labels, **MARKUP_SYMBOLS}
+
+
+MARKUP_SYMBOLS = {
     "CTRL": "<big><big><sub>⌃</sub></big></big>",
     "SHIFT": "<b>⇧</b>",
-    "ALT": "⌥",
-    "SUPER": "◆",
-    "rCMD": "⌘",
     "rCTRL": "<big><big><sub>⌃</sub></big></big>",
-    "rSHIFT": "⇧",
-    "rALT": "⌥",
-    "rSUPER": "◆",
-    "SPACE": "⎵",
     # "ENTER": "↵",
     "ENTER": material_icon("e31b"),
-    "TAB": "⇥",
-    "PIPE": "|",
     "BSPC": "<small>⌫</small>",
     "DEL": "<small>⌦</small>",
     "ESC": "<small>esc</small>",
-    "APP": "☰",
     # "CAPS": lock_label("caps", "(word)"),
     "CAPS": material_icon("e318"),
     "CLOCK": lock_label("caps"),
@@ -291,14 +304,6 @@ SYMBOLS = {
     "BREAK": text_label("break"),
     "PSCR": text_label("print", "screen"),
     "PAUSE": text_label("pause", "break"),
-    "LEFT": "←",
-    "RIGHT": "→",
-    "UP": "↑",
-    "DOWN": "↓",
-    "PG_UP": "⇞",
-    "PG_DN": "⇟",
-    "HOME": "⇱",
-    "END": "⇲",
     "&": "&amp;",
     "<": "&lt;",
     ">": "&gt;",
@@ -353,8 +358,8 @@ SYMBOLS = {
 
 
 def label_to_pango(txt: str):
-    xs, y = split_mods(txt)
-    return "".join(SYMBOLS.get(x, x) for x in (*xs, y))
+    symbol = symbols()
+    return "".join(symbol.get(x, x) for x in parse_keycode(txt))
 
 
 def key_sublegends(
@@ -426,6 +431,8 @@ class Rect:
 
 
 def tmp_context():
+    import cairocffi
+
     surface = cairocffi.RecordingSurface(cairocffi.CONTENT_COLOR_ALPHA, None)
     return cairocffi.Context(surface)
 
@@ -448,17 +455,20 @@ def transform_cairo_path(
 CairoPath = list[tuple[int, tuple[float, ...]]]
 CairoPathLike = Iterable[tuple[int, tuple[float, ...]]]
 
+# cairo_path_data_type_t, so that paths can be handled without loading cairo
+PATH_MOVE_TO, PATH_LINE_TO, PATH_CURVE_TO, PATH_CLOSE_PATH = range(4)
+
 
 def cairo_path_to_svg(path: CairoPathLike):
     def parts() -> Iterator[float | str]:
         for cmd, cs in path:
-            if cmd == cairocffi.PATH_MOVE_TO:
+            if cmd == PATH_MOVE_TO:
                 yield "M"
-            elif cmd == cairocffi.PATH_LINE_TO:
+            elif cmd == PATH_LINE_TO:
                 yield "L"
-            elif cmd == cairocffi.PATH_CURVE_TO:
+            elif cmd == PATH_CURVE_TO:
                 yield "C"
-            elif cmd == cairocffi.PATH_CLOSE_PATH:
+            elif cmd == PATH_CLOSE_PATH:
                 yield "Z"
             yield from cs
 
@@ -471,6 +481,8 @@ def simplify_svg_path(d: str):
         s = f"{float(float_str):.4f}".rstrip("0").rstrip(".")
         return re.sub(r"^([-+]?)0+\.", r"\1.", s)
 
+    import svgelements
+
     d = svgelements.Path(d).d(relative=True)  # type: ignore
     d = re.sub(r"(\d+)[.](\d+)", lambda m: f(m.group(0)), d)
     d = re.sub(r"([mlc])\s+", r"\1", d)
@@ -505,6 +517,19 @@ def cairo_rounded_rectangle(
     return ctx.copy_path()
 
 
+@cache
+def render_legend(legend: str, align: str) -> tuple[str, Rect]:
+    is_mod = any(x in legend for x in "⇧⌘⌥◆☰⌃")
+    legend_path, bbox = render_text(
+        legend,
+        font=["Deja Vu", "Intel One Mono"],
+        size=0.25,
+        align=align,
+        strict_bbox=is_mod,
+    )
+    return cairo_path_to_svg(legend_path), bbox
+
+
 def render_text(
     text: str,
     font: str | Iterable[str] = "Deja Vu",
@@ -512,6 +537,9 @@ def render_text(
     align: str = "c",
     strict_bbox: bool = False,
 ) -> tuple[CairoPath, Rect]:
+    import pangocairocffi
+    import pangocffi
+
     if "w" in align:
         pango_align = pangocffi.Alignment.LEFT
     elif "e" in align:
@@ -551,13 +579,13 @@ def render_text(
 
 def arrow_heads(path: CairoPathLike, s: float) -> CairoPathLike:
     for sub in split_path(path):
-        while sub[-1][0] == cairocffi.PATH_CLOSE_PATH:
+        while sub[-1][0] == PATH_CLOSE_PATH:
             sub.pop()
 
-        if sub[-1][0] == cairocffi.PATH_CURVE_TO:
+        if sub[-1][0] == PATH_CURVE_TO:
             a = sub[-1][1]
             yield from arrow_head(complex(a[2], a[3]), complex(a[4], a[5]), s)
-        elif sub[-1][0] == cairocffi.PATH_LINE_TO:
+        elif sub[-1][0] == PATH_LINE_TO:
             yield from arrow_head(
                 complex(*sub[-2][1][-2:]), complex(*sub[-1][1][-2:]), s
             )
@@ -571,17 +599,17 @@ def arrow_head(a: complex, b: complex, s: float) -> CairoPath:
     c = b - u * s + v * s / 2
     d = b - u * s - v * s / 2
     return [
-        (cairocffi.PATH_MOVE_TO, (b.real, b.imag)),
-        (cairocffi.PATH_LINE_TO, (c.real, c.imag)),
-        (cairocffi.PATH_LINE_TO, (d.real, d.imag)),
-        (cairocffi.PATH_CLOSE_PATH, ()),
+        (PATH_MOVE_TO, (b.real, b.imag)),
+        (PATH_LINE_TO, (c.real, c.imag)),
+        (PATH_LINE_TO, (d.real, d.imag)),
+        (PATH_CLOSE_PATH, ()),
     ]
 
 
 def split_path(path: CairoPathLike) -> Iterator[CairoPath]:
     sub: CairoPath = []
     for c, ps in path:
-        if c == cairocffi.PATH_MOVE_TO and sub:
+        if c == PATH_MOVE_TO and sub:
             yield sub[:]
             sub = []
         sub.append((c, ps))
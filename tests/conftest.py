@@ -0,0 +1,19 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+@pytest.fixture(autouse=True, scope="session")
+def cache_home(tmp_path_factory: pytest.TempPathFactory):
+    from codegen.keycode_db import configure_keycode_database
+
+    # keep the keycode database and artifacts out of the user's cache
+    with pytest.MonkeyPatch.context() as mp:
+        path = tmp_path_factory.mktemp("cache")
+        mp.setenv("XDG_CACHE_HOME", str(path))
+        configure_keycode_database()
+        yield path
+    configure_keycode_database()
@@ -0,0 +1,24 @@
+from pathlib import Path
+
+from codegen.source import ALT_LAYOUTS
+from generate import analyze_targets, analyzed_reshapes
+
+README = Path(__file__).parent.parent / "readme.md"
+
+
+def test_analyzed_reshapes_skip_source_layout():
+    reshapes = analyzed_reshapes()
+    assert reshapes[0] is None
+    assert "source" not in reshapes
+    assert reshapes[1:] == [k for k in ALT_LAYOUTS if k != "source"]
+
+
+def test_analyzed_reshapes_single():
+    assert analyzed_reshapes("split3x5+3") == ["split3x5+3"]
+
+
+def test_analyze_targets_layouts():
+    analyses = list(analyze_targets(README, ["ZMK", "QMK"], analyzed_reshapes()))
+    layouts = [(a.firmware, a.layout) for a in analyses]
+    expected = ["default", *(k for k in ALT_LAYOUTS if k != "source")]
+    assert layouts == [(f, layout) for layout in expected for f in ("ZMK", "QMK")]
@@ -0,0 +1,56 @@
+from codegen.asciitables import Table, format_boxed_table
+
+TABLE = """
+| a | b     | c |
+| d | e | f | g |
+| h     | i | j |
+"""
+
+
+def test_cells_are_row_major():
+    table = Table.Parse(TABLE)
+    assert (table.row_count, table.col_count) == (3, 4)
+    assert table.values == list("abcdefghij")
+    assert table.row(1) == list("defg")
+    assert table.column(1) == ["b", "e"]
+    assert table.column(2) == ["f", "i"]
+    assert table.anchor((0, 2)) == (0, 1)
+    assert table.anchor((2, 1)) == (2, 0)
+    assert table.anchor((3, 0)) is None
+
+
+def test_out_of_order_shapes_are_sorted():
+    shape = {(1, 0): (1, 2), (0, 1): (1, 1), (0, 0): (1, 1)}
+    table = Table.Shape(shape, {(0, 0): "x", (1, 0): "z"}, "y")
+    assert table.values == ["x", "y", "z"]
+    assert list(table.shape) == [(0, 0), (0, 1), (1, 0)]
+    assert table.row(1) == ["z"]
+
+
+def test_derived_tables_keep_the_shape():
+    table = Table.Parse(TABLE)
+    table.anchor((0, 0))
+    upper = table.map_contents(str.upper)
+    assert upper.__dict__["_grid"] is table.__dict__["_grid"]
+    assert upper.row(2) == list("HIJ")
+    assert upper.shape == table.shape
+
+    trimmed = table.remove_cells(lambda v: v in "bf")
+    assert trimmed.row(0) == ["a", "c"]
+    assert trimmed.anchor((0, 1)) is None
+
+    src = Table.Parse("| a | b |")
+    dst = Table.Parse("| b | x | a |")
+    assert Table.Parse("| 1 | 2 |").reshape(src, dst, "-").values == ["2", "-", "1"]
+
+
+def test_boxed_table_spans():
+    assert format_boxed_table(Table.Parse(TABLE)).splitlines() == [
+        "┌───┬───────┬───┐",
+        "│ a │   b   │ c │",
+        "├───┼───┬───┼───┤",
+        "│ d │ e │ f │ g │",
+        "├───┴───┼───┼───┤",
+        "│   h   │ i │ j │",
+        "└───────┴───┴───┘",
+    ]
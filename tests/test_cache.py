@@ -0,0 +1,27 @@
+import os
+
+from codegen.cache import ArtifactCache
+
+
+def test_prune_keeps_recently_used(tmp_path):
+    cache = ArtifactCache(tmp_path, "v", max_entries=2)
+    keys = [cache.key("src", {"n": n}) for n in range(3)]
+    for n, key in enumerate(keys[:2]):
+        cache.put(key, f"data {n}".encode())
+        os.utime(tmp_path / "targets" / key, (n, n))
+
+    assert cache.get(keys[0]) == b"data 0"
+    cache.put(keys[2], b"data 2")
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == b"data 0"
+    assert cache.get(keys[2]) == b"data 2"
+    assert len(list((tmp_path / "objects").iterdir())) == 2
+
+
+def test_clear(tmp_path):
+    cache = ArtifactCache(tmp_path, "v")
+    key = cache.key("src", {})
+    cache.put(key, b"data")
+    cache.clear()
+    assert cache.get(key) is None
@@ -0,0 +1,116 @@
+import pytest
+
+from codegen.footprint import Footprint
+from generate import analyze_targets
+
+FIXTURE = """
+# Fixture
+
+## Layout definition
+
+### Letters `base` layer
+```
+|   a   |   (   |  ,;   | COPY  |  XXX  |
+```
+
+### Home row mods and layers with `hold-tap`
+```
+| SHIFT |  NUM  |       |       |       |
+```
+
+### Numerals (`NUM`)
+```
+|   1   |  ___  |   é   | UNDO  |  XXX  |
+```
+
+### Function keys (`FUN`)
+```
+|  F1   |  F2   |  ___  |  ___  |  XXX  |
+```
+
+## OS specific macros
+
+|         | linux    | mac         |
+|---------|----------|-------------|
+|  COPY   | CTRL+C   | CMD+C       |
+|  UNDO   | CTRL+Z   | CMD+Z       |
+"""
+
+# layers, bindings, assigned, keymap size, macros, tap-dances, key-overrides,
+# hold-taps, flash, ram
+#
+# ZMK: 12 bytes per binding, every behavior node is 40 bytes plus 12 per
+# binding cell and 4 bytes of state, macros have 16 more. hrm and comma_semi
+# have 2 cells, the é macros 7 on linux and 9 on mac.
+ZMK = {
+    "total": (5, 25, 16, 300, 2, 0, 1, 1, 300 + 64 + 64 + 124 + 148, 48),
+    "linux": (3, 15, 9, 180, 1, 0, 1, 1, 180 + 64 + 64 + 124, 28),
+    "mac": (3, 15, 9, 180, 1, 0, 1, 1, 180 + 64 + 64 + 148, 28),
+    "base_l": (1, 5, 4, 60, 0, 0, 1, 1, 60 + 64 + 64, 8),
+    "base_m": (1, 5, 4, 60, 0, 0, 1, 1, 60 + 64 + 64, 8),
+    "NUM_l": (1, 5, 3, 60, 1, 0, 0, 0, 60 + 124, 20),
+    "NUM_m": (1, 5, 3, 60, 1, 0, 0, 0, 60 + 148, 20),
+    "FUN_lm": (1, 5, 2, 60, 0, 0, 0, 0, 60, 0),
+}
+
+# QMK: 2 bytes per keycode, the key override is 18 bytes of flash and a 2 byte
+# pointer, every layer-tap of a shifted keycode is a tap dance with 18 bytes
+# of state
+QMK = {
+    "total": (5, 25, 16, 50, 0, 2, 1, 0, 50 + 18, 18 + 18 + 2),
+    "linux": (3, 15, 9, 30, 0, 1, 1, 0, 30 + 18, 18 + 2),
+    "mac": (3, 15, 9, 30, 0, 1, 1, 0, 30 + 18, 18 + 2),
+    "base_l": (1, 5, 4, 10, 0, 1, 1, 0, 10 + 18, 18 + 2),
+    "base_m": (1, 5, 4, 10, 0, 1, 1, 0, 10 + 18, 18 + 2),
+    "NUM_l": (1, 5, 3, 10, 0, 0, 0, 0, 10, 0),
+    "NUM_m": (1, 5, 3, 10, 0, 0, 0, 0, 10, 0),
+    "FUN_lm": (1, 5, 2, 10, 0, 0, 0, 0, 10, 0),
+}
+
+
+def summary(footprint: Footprint):
+    return (
+        footprint.layers,
+        footprint.bindings,
+        footprint.assigned,
+        footprint.keymap_size,
+        *map(footprint.count, ("macro", "tap-dance", "key-override", "hold-tap")),
+        footprint.flash,
+        footprint.ram,
+    )
+
+
+@pytest.fixture
+def analyses(tmp_path):
+    readme = tmp_path / "readme.md"
+    readme.write_text(FIXTURE, encoding="utf-8")
+    return {a.firmware: a for a in analyze_targets(readme, ["ZMK", "QMK"], [None])}
+
+
+@pytest.mark.parametrize("firmware, expected", [("ZMK", ZMK), ("QMK", QMK)])
+def test_fixture_footprint(analyses, firmware, expected):
+    analysis = analyses[firmware]
+    assert list(analysis.by_os) == ["linux", "mac"]
+    assert list(analysis.by_layer) == ["base_l", "base_m", "NUM_l", "NUM_m", "FUN_lm"]
+    footprints = {"total": analysis.total, **analysis.by_os, **analysis.by_layer}
+    assert {k: summary(f) for k, f in footprints.items()} == expected
+
+
+def test_fixture_entries(analyses):
+    zmk, qmk = analyses["ZMK"], analyses["QMK"]
+    assert sorted(zmk.by_os["linux"].behaviors) == [
+        "comma_semi",
+        "hrm",
+        "kp",
+        "lt",
+        "none",
+        "trans",
+        "u00e9_L",
+    ]
+    assert sorted(zmk.by_os["mac"].entries) == ["comma_semi", "hrm", "u00e9_M"]
+    assert sorted(qmk.total.behaviors) == ["KC", "KO", "MT", "TD", "UC"]
+    assert sorted(qmk.total.entries) == [
+        "KC_COMM_KC_SCLN",
+        "LT_NUM_l_LPRN",
+        "LT_NUM_m_LPRN",
+    ]
@@ -0,0 +1,31 @@
+import os
+
+import pytest
+
+from codegen.import_budget import (
+    ENTRY_POINTS,
+    deferred_imports,
+    import_time_ms,
+    loaded_modules,
+)
+
+
+@pytest.mark.parametrize("module", ENTRY_POINTS)
+def test_entry_points_defer_heavy_imports(module):
+    assert deferred_imports(module) == []
+
+
+def test_deferred_imports_detected():
+    assert "codegen.qmk" in loaded_modules("codegen.footprint")
+    assert "codegen.qmk" in deferred_imports("codegen.footprint")
+
+
+# timings depend on the machine, so this only runs with a budget, e.g.
+# IMPORT_BUDGET_MS=400 python3 -m pytest tests/test_imports.py
+@pytest.mark.skipif(
+    not os.environ.get("IMPORT_BUDGET_MS"), reason="IMPORT_BUDGET_MS is not set"
+)
+@pytest.mark.parametrize("module", ENTRY_POINTS)
+def test_entry_points_import_within_budget(module):
+    budget_ms = float(os.environ["IMPORT_BUDGET_MS"])
+    assert import_time_ms(module, runs=3) <= budget_ms
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from codegen import keycode_db
+from codegen.keycode_db import KeycodeDatabase
+
+
+@pytest.fixture(autouse=True)
+def home(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    yield tmp_path
+    keycode_db.configure_keycode_database()
+
+
+def test_no_cache_writes_nothing(home):
+    keycode_db.configure_keycode_database(home / "cache", use_cache=False)
+    assert keycode_db.keycode_database().qmk("a") == "KC_A"
+    assert not (home / "cache").exists()
+    assert not (home / "xdg").exists()
+
+
+def test_default_path_follows_xdg_cache_home(home):
+    keycode_db.configure_keycode_database()
+    keycode_db.keycode_database()
+    assert (home / "xdg" / "ichnite-layout" / "keycodes.json").exists()
+
+
+def test_cache_dir(home):
+    keycode_db.configure_keycode_database(home / "cache")
+    keycode_db.keycode_database()
+    assert (home / "cache" / "keycodes.json").exists()
+    assert not (home / "xdg").exists()
+
+
+def test_unchanged_stamp_skips_hashing(home, monkeypatch):
+    path = home / "keycodes.json"
+    KeycodeDatabase.Load(path)
+
+    def sources_digest():
+        raise AssertionError("sources hashed")
+
+    monkeypatch.setattr(keycode_db, "sources_digest", sources_digest)
+    assert KeycodeDatabase.Load(path).qmk("a") == "KC_A"
+
+
+def test_touched_sources_revalidate_by_digest(home, monkeypatch):
+    path = home / "keycodes.json"
+    KeycodeDatabase.Load(path)
+    data = json.loads(path.read_bytes())
+    data["stamp"] = []
+    path.write_text(json.dumps(data))
+
+    monkeypatch.setattr(KeycodeDatabase, "Compile", None)
+    KeycodeDatabase.Load(path)
+    assert json.loads(path.read_bytes())["stamp"] == keycode_db.sources_stamp()
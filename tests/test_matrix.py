@@ -0,0 +1,55 @@
+from codegen.matrix import KeymapMatrix
+from codegen.source import (
+    Key,
+    Keymap,
+    LayerName,
+    ReshapePlan,
+    make_multi_os_layers,
+)
+
+SHAPE = {(0, c): (1, 1) for c in range(3)}
+LAYERS = {
+    "base": [Key("A"), Key("B", "NAV"), Key("CMD")],
+    "NAV": [Key("LEFT"), Key(), Key("CMD")],
+    "copy": [Key("A"), Key("B", "NAV"), Key("CMD")],
+}
+
+
+def test_round_trip_keeps_interned_keys():
+    keymap = KeymapMatrix.From_layers(LAYERS, SHAPE).to_keymap()
+    assert keymap.table_shape == SHAPE
+    assert keymap.layers == LAYERS
+    assert all(
+        a is b for name in LAYERS for a, b in zip(keymap.layers[name], LAYERS[name])
+    )
+
+
+def test_identical_layers():
+    matrix = KeymapMatrix.From_layers(LAYERS, SHAPE)
+    assert matrix.identical_layers() == [["base", "copy"], ["NAV"]]
+
+
+def test_reshape_matches_list_reshape():
+    plan = ReshapePlan((2, -1, 0, 1), {(0, c): (1, 1) for c in range(4)})
+    keymap = Keymap(LAYERS, SHAPE)
+    matrix = KeymapMatrix.From_keymap(keymap).reshape_by(plan, Key.Empty())
+    assert matrix.to_keymap() == keymap.reshape_by(plan, Key.Empty())
+
+
+def test_map_strings_changes_only_mapped_keys():
+    matrix = KeymapMatrix.From_layers(LAYERS, SHAPE)
+    variant = matrix.map_strings(lambda s: {"CMD": "CTRL"}.get(s, s))
+    assert matrix.changes(variant, 0) == {2: Key("CTRL")}
+    assert variant.to_layers()["base"][:2] == LAYERS["base"][:2]
+
+
+def test_multi_os_layers():
+    layers = dict(make_multi_os_layers(LAYERS, {"win": {"CMD": "CTRL"}, "mac": {}}))
+    assert list(layers) == [(name, os) for name in LAYERS for os in ("win", "mac")]
+    assert list(layers["base", "win"]) == [
+        Key("A"),
+        Key("B", LayerName("NAV/win")),
+        Key("CTRL"),
+    ]
+    assert layers["NAV", "mac"].changes == {}
+    assert layers["base", "mac"].changes == {1: Key("B", LayerName("NAV/mac"))}
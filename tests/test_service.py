@@ -0,0 +1,118 @@
+import json
+import threading
+import time
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from codegen.service import KeymapService, make_server
+
+README = Path(__file__).parent.parent / "readme.md"
+
+
+@pytest.fixture(scope="module")
+def url():
+    service = KeymapService(lambda keymap, titles, os_specifics, options: b"")
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/generate"
+    server.shutdown()
+    server.server_close()
+
+
+def post(url: str, payload) -> tuple[int, dict]:
+    request = Request(url, json.dumps(payload).encode(), method="POST")
+    try:
+        with urlopen(request) as response:
+            return response.status, json.load(response)
+    except HTTPError as e:
+        with e:
+            return e.code, json.load(e)
+
+
+@pytest.fixture(scope="module")
+def base(url):
+    status, response = post(url, {"markdown": README.read_text()})
+    assert status == 200
+    return response["digest"]
+
+
+@pytest.mark.parametrize("table", [None, 42, ["|a|"], {"a": "b"}])
+def test_malformed_tables(url, base, table):
+    status, response = post(url, {"base": base, "tables": {"base": table}})
+    assert status == 400
+    assert "tables" in response["error"]
+
+
+@pytest.mark.parametrize(
+    "payload", [[], "x", {"tables": ["|a|"]}, {"markdown": "", "targets": "ZMK"}]
+)
+def test_malformed_requests(url, payload):
+    status, response = post(url, payload)
+    assert status == 400
+    assert response["error"]
+
+
+def test_internal_errors(caplog):
+    def build_target(keymap, titles, os_specifics, options):
+        raise AttributeError("boom")
+
+    server = make_server(KeymapService(build_target), port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        status, response = post(
+            f"http://127.0.0.1:{server.server_address[1]}/generate",
+            {"markdown": README.read_text(), "targets": [{"command": "ZMK"}]},
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert status == 500
+    assert response == {"error": "internal error"}
+    assert "failed to handle /generate request" in caplog.text
+
+
+def test_unknown_layer(url, base):
+    status, response = post(url, {"base": base, "tables": {"nope": "|a|"}})
+    assert status == 400
+    assert "nope" in response["error"]
+
+
+def test_unknown_base(url):
+    status, response = post(url, {"base": "nope"})
+    assert status == 400
+    assert "nope" in response["error"]
+
+
+def test_generation_is_serialized():
+    active = []
+    overlaps = []
+
+    def build_target(keymap, titles, os_specifics, options):
+        active.append(options)
+        overlaps.append(len(active))
+        time.sleep(0.01)
+        active.remove(options)
+        return b""
+
+    service = KeymapService(build_target)
+    markdown = README.read_text()
+    threads = [
+        threading.Thread(
+            target=service.handle,
+            args=({"markdown": markdown, "targets": [{"n": n}]},),
+        )
+        for n in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(overlaps) == 8
+    assert max(overlaps) == 1
@@ -0,0 +1,24 @@
+from pathlib import Path
+
+from codegen.markdown import MarkdownIndex
+from codegen.source import KeymapParser, base_keymap_from_md, default_keymap_parser
+
+README = Path(__file__).parent.parent / "readme.md"
+
+
+def test_base_keymap_reuses_the_parser_caches():
+    index = MarkdownIndex(README.read_bytes())
+    first, _ = base_keymap_from_md(index)
+    second, _ = base_keymap_from_md(index)
+    assert default_keymap_parser() is default_keymap_parser()
+    assert all(second.layers[name] is keys for name, keys in first.layers.items())
+
+
+def test_base_keymap_uses_the_given_parser():
+    index = MarkdownIndex(README.read_bytes())
+    parser = KeymapParser()
+    first, _ = base_keymap_from_md(index, parser=parser)
+    second, _ = base_keymap_from_md(index, parser=parser)
+    third, _ = base_keymap_from_md(index, parser=KeymapParser())
+    assert first.layers["base"] is second.layers["base"]
+    assert first.layers["base"] is not third.layers["base"]
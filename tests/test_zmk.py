@@ -0,0 +1,19 @@
+from io import StringIO
+from pathlib import Path
+
+from codegen.markdown import MarkdownIndex
+from codegen.source import KeymapParser, make_multi_os_layers
+from codegen.zmk import generate_zmk_keymap_code, write_zmk_keymap_code
+
+README = Path(__file__).parent.parent / "readme.md"
+
+
+def test_generate_wraps_write():
+    keymap, titles = KeymapParser().parse(MarkdownIndex(README.read_bytes()))
+    layers = list(make_multi_os_layers(keymap.layers, {"win": {}, "mac": {}}))
+
+    sink = StringIO()
+    write_zmk_keymap_code(sink, keymap, titles, layers, transform_name="t")
+    lines = list(generate_zmk_keymap_code(keymap, titles, layers, transform_name="t"))
+    assert "\n".join(lines) + "\n" == sink.getvalue()
+    assert "zmk,matrix_transform = &t;" in "\n".join(lines)